@@ -8,6 +8,7 @@ name = "handybeam"
 
 __all__ = [
     'bugcatcher',
+    'cl_autotuner',
     'cl_system',
     'evaluators',
     'misc',
@@ -19,6 +20,7 @@ __all__ = [
     'world',
     'cl',
     'cl_py_ref_code',
+    'cpu_wrappers',
     'opencl_wrappers',
     'propagator_mixins',
     'samplers',
@@ -6,7 +6,9 @@ __kernel void _hbk_clist_propagator(
         __global float *sampling_point_list,                             // This is the list of sampling points. 
         __global float *cl_field,                                        // This is the output buffer for the sampling grid coordinates and pressure values.
         unsigned int tx_count,                                           // This is the number of transducers.
-        unsigned int sampling_point_list_count                           // This is the number of points in the sampling point list.
+        unsigned int sampling_point_list_count,                          // This is the number of points in the sampling point list.
+        float medium_wavelength,                                         // This is the wavelength in the medium.
+        float medium_wavenumber                                          // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
           )
           {
              
@@ -14,6 +16,14 @@ __kernel void _hbk_clist_propagator(
                 
                 unsigned int sampling_point_idx = get_global_id(0);    
 
+                // The global work size is rounded up to a multiple of the local work size,
+                // so the threads past the end of the list have nothing to do.
+
+                if (sampling_point_idx >= sampling_point_list_count)
+                {
+                    return;
+                }
+
                 unsigned int sampling_point_pointer=3*sampling_point_idx;
 
                 // Assign grid coordinates.
@@ -146,4 +156,147 @@ __kernel void _hbk_clist_propagator(
 
 
          
-          } 
\ No newline at end of file
+          } 
+
+// This is the tiled variant of _hbk_clist_propagator. The work group stages the transducer descriptors
+// in __local memory, tile_tx_count at a time, instead of each work item reading all of them from global memory.
+
+__kernel void _hbk_clist_propagator_tiled(
+        __global const float16 *cl_tx_element_array_descriptor,          // This is the input buffer for the tx elements.
+        __global float *sampling_point_list,                             // This is the list of sampling points.
+        __global float *cl_field,                                        // This is the output buffer for the sampling grid coordinates and pressure values.
+        unsigned int tx_count,                                           // This is the number of transducers.
+        unsigned int sampling_point_list_count,                          // This is the number of points in the sampling point list.
+        float medium_wavelength,                                         // This is the wavelength in the medium.
+        float medium_wavenumber,                                         // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
+        __local float16 *tx_tile,                                        // This is the local memory for one tile of transducers.
+        unsigned int tile_tx_count                                       // This is the number of transducers that fit in the tile.
+          )
+          {
+
+                // Get thread coordinates in the computational grid.
+
+                unsigned int sampling_point_idx = get_global_id(0);
+
+                // The threads past the end of the list have no output, but still help to load the tiles.
+
+                int is_sampling_point = sampling_point_idx < sampling_point_list_count;
+                unsigned int sampling_point_pointer = is_sampling_point ? 3*sampling_point_idx : 0;
+
+                // Assign grid coordinates.
+
+                float pixel_x_coordinate=(float)sampling_point_list[sampling_point_pointer+0];
+                float pixel_y_coordinate=(float)sampling_point_list[sampling_point_pointer+1];
+                float pixel_z_coordinate=(float)sampling_point_list[sampling_point_pointer+2];
+
+                // Initialise pressure values
+
+                float pressure_re = (float)0.0;
+                float pressure_im = (float)0.0;
+
+                int is_valid = is_sampling_point;
+
+                // Iterate through the tiles of transducers.
+
+                for (unsigned int tile_base=0; tile_base<tx_count; tile_base+=tile_tx_count)
+                {
+                    unsigned int tile_count = min(tile_tx_count, tx_count - tile_base);
+
+                    hbk_load_tx_tile(tx_tile, cl_tx_element_array_descriptor, tile_base, tile_count);
+
+                    if (is_valid)
+                    {
+                        is_valid = hbk_add_tx_tile(tx_tile, tile_count,
+                                                   pixel_x_coordinate, pixel_y_coordinate, pixel_z_coordinate,
+                                                   medium_wavelength, medium_wavenumber,
+                                                   &pressure_re, &pressure_im);
+                    }
+                }
+
+                if (!is_sampling_point)
+                {
+                    return;
+                }
+
+                if (!is_valid)
+                {
+                    pressure_re = NAN;
+                    pressure_im = NAN;
+                }
+
+                unsigned int output_pointer_base = 2 * sampling_point_idx ;
+
+                cl_field[output_pointer_base+0] = pressure_re;
+                cl_field[output_pointer_base+1] = pressure_im;
+
+          }
+
+
+// These are the blocked variants of _hbk_clist_propagator. Each thread computes points_per_item consecutive
+// points of the list, so that each transducer loaded from global memory is used points_per_item times.
+// The global work size is the point count / points_per_item, rounded up - the points past the end of the list are skipped.
+// The macro defines one kernel per block size, so that the per-point accumulators can stay in registers.
+
+#define HBK_CLIST_PROPAGATOR_BLOCKED(kernel_name, points_per_item)                                             \
+__kernel void kernel_name(                                                                                     \
+        __global const float16 *cl_tx_element_array_descriptor,  /* This is the input buffer for the tx elements. */  \
+        __global float *sampling_point_list,                     /* This is the list of sampling points.           */  \
+        __global float *cl_field,                                /* This is the output buffer for the pressure.    */  \
+        unsigned int tx_count,                                   /* This is the number of transducers.             */  \
+        unsigned int sampling_point_list_count,                  /* This is the number of points in the list.      */  \
+        float medium_wavelength,                                 /* This is the wavelength in the medium.          */  \
+        float medium_wavenumber                                  /* This is the wavenumber in the medium.          */  \
+          )                                                                                                    \
+          {                                                                                                    \
+                unsigned int first_sampling_point_idx = get_global_id(0) * points_per_item;                    \
+                                                                                                               \
+                float pixel_x_coordinate[points_per_item];                                                     \
+                float pixel_y_coordinate[points_per_item];                                                     \
+                float pixel_z_coordinate[points_per_item];                                                     \
+                float pressure_re[points_per_item];                                                            \
+                float pressure_im[points_per_item];                                                            \
+                int is_valid[points_per_item];                                                                 \
+                                                                                                               \
+                for (unsigned int point_idx=0; point_idx<points_per_item; point_idx++)                         \
+                {                                                                                              \
+                    unsigned int sampling_point_idx = first_sampling_point_idx + point_idx;                    \
+                    is_valid[point_idx] = sampling_point_idx < sampling_point_list_count;                      \
+                    unsigned int sampling_point_pointer = is_valid[point_idx] ? 3*sampling_point_idx : 0;      \
+                    pixel_x_coordinate[point_idx] = sampling_point_list[sampling_point_pointer+0];             \
+                    pixel_y_coordinate[point_idx] = sampling_point_list[sampling_point_pointer+1];             \
+                    pixel_z_coordinate[point_idx] = sampling_point_list[sampling_point_pointer+2];             \
+                    pressure_re[point_idx] = (float)0.0;                                                       \
+                    pressure_im[point_idx] = (float)0.0;                                                       \
+                }                                                                                              \
+                                                                                                               \
+                for (unsigned int tx_idx=0; tx_idx<tx_count; tx_idx++)                                         \
+                {                                                                                              \
+                    float16 tx = cl_tx_element_array_descriptor[tx_idx];                                       \
+                                                                                                               \
+                    for (unsigned int point_idx=0; point_idx<points_per_item; point_idx++)                     \
+                    {                                                                                          \
+                        if (is_valid[point_idx])                                                               \
+                        {                                                                                      \
+                            is_valid[point_idx] = hbk_add_tx_contribution(tx,                                  \
+                                        pixel_x_coordinate[point_idx], pixel_y_coordinate[point_idx], pixel_z_coordinate[point_idx], \
+                                        medium_wavelength, medium_wavenumber,                                  \
+                                        &pressure_re[point_idx], &pressure_im[point_idx]);                     \
+                        }                                                                                      \
+                    }                                                                                          \
+                }                                                                                              \
+                                                                                                               \
+                for (unsigned int point_idx=0; point_idx<points_per_item; point_idx++)                         \
+                {                                                                                              \
+                    unsigned int sampling_point_idx = first_sampling_point_idx + point_idx;                    \
+                                                                                                               \
+                    if (sampling_point_idx < sampling_point_list_count)                                        \
+                    {                                                                                          \
+                        cl_field[2*sampling_point_idx+0] = is_valid[point_idx] ? pressure_re[point_idx] : NAN; \
+                        cl_field[2*sampling_point_idx+1] = is_valid[point_idx] ? pressure_im[point_idx] : NAN; \
+                    }                                                                                          \
+                }                                                                                              \
+          }
+
+HBK_CLIST_PROPAGATOR_BLOCKED(_hbk_clist_propagator_blocked2, 2)
+HBK_CLIST_PROPAGATOR_BLOCKED(_hbk_clist_propagator_blocked4, 4)
+HBK_CLIST_PROPAGATOR_BLOCKED(_hbk_clist_propagator_blocked8, 8)
@@ -0,0 +1,127 @@
+// These are the functions shared by the tiled and blocked propagation kernels.
+//
+// The tiled kernels stage the transducer descriptors in __local memory, one tile at a time,
+// so that each descriptor is read from global memory once per work group rather than once per work item.
+// The blocked kernels compute several sampling points per work item, so that each descriptor they read is used several times.
+// A row of the tx element array descriptor is 16 floats, i.e. exactly one float16:
+//
+//   s0 - s2 : position,  s3 - s5 : normal,  s6 : directivity phase c1,
+//   s7 - s9 : directivity amplitude c0, c1, c2,  sa : amplitude,  sb : phase,  sc - sf : unused.
+
+
+// Adds the pressure that one transducer generates at the sampling point to (pressure_re, pressure_im).
+// Returns 0, and leaves the pressure unchanged, if the point is inside the transducer or behind it -
+// there is no valid output for such a point.
+
+inline int hbk_add_tx_contribution(
+        float16 tx,                                                      // This is one row of the tx element array descriptor.
+        float pixel_x_coordinate,                                        // These are the coordinates of the sampling point.
+        float pixel_y_coordinate,
+        float pixel_z_coordinate,
+        float medium_wavelength,                                         // This is the wavelength in the medium.
+        float medium_wavenumber,                                         // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
+        float *pressure_re,                                              // These accumulate the pressure at the sampling point.
+        float *pressure_im
+        )
+        {
+
+            // Calculate the distance from this transducer to the sampling point.
+
+            float delta_x = pixel_x_coordinate - tx.s0;
+            float delta_y = pixel_y_coordinate - tx.s1;
+            float delta_z = pixel_z_coordinate - tx.s2;
+
+            float recp_distance = rsqrt(delta_x*delta_x + delta_y*delta_y + delta_z*delta_z);
+
+            // There can be no output inside a transducer.
+
+            if (medium_wavenumber<recp_distance)
+            {
+                return 0;
+            }
+
+            // Now calculate the cosine of angle using the normal.
+
+            float cosine_of_angle_to_normal =  ( delta_x*tx.s3 + delta_y*tx.s4 + delta_z*tx.s5 ) * recp_distance ;
+
+            // The is no signal behind the transducer.
+
+            if (cosine_of_angle_to_normal<0.0)
+            {
+                return 0;
+            }
+
+            // Calculate the phase distance shift and the amplitude distance drop.
+
+            float phase_distance_shift = (float) tau  * medium_wavenumber * (1.0 / recp_distance);
+            float phase_distance_shift_wrapped = fmod(phase_distance_shift, (float) tau);
+
+            float amplitude_distance_drop = recp_distance * medium_wavelength;
+
+            // Apply the directivity function.
+
+            float ca = 1.0 - cosine_of_angle_to_normal;
+            float directivity_phase = tx.s6 * ca;
+            float directivity_amplitude_drop = tx.s7 + tx.s8 * ca + tx.s9 * (ca*ca);
+
+            float rx_amplitude = tx.sa * amplitude_distance_drop * directivity_amplitude_drop;
+            float rx_phase     = tx.sb + phase_distance_shift_wrapped + directivity_phase;
+
+            // Accumulate result
+
+            *pressure_re = *pressure_re + native_cos(rx_phase) * rx_amplitude;
+            *pressure_im = *pressure_im + native_sin(rx_phase) * rx_amplitude;
+
+            return 1;
+        }
+
+
+// Copies the rows tile_base ... tile_base+tile_count-1 of the descriptor into the tile in __local memory.
+// The work items of the group share the copy, so all of them have to call this, with the same arguments.
+
+inline void hbk_load_tx_tile(
+        __local float16 *tx_tile,                                        // This is the tile in local memory.
+        __global const float16 *cl_tx_element_array_descriptor,          // This is the input buffer for the tx elements.
+        unsigned int tile_base,                                          // This is the index of the first transducer of the tile.
+        unsigned int tile_count                                          // This is the number of transducers in the tile.
+        )
+        {
+
+            // Wait until all the work items are done with the previous tile.
+
+            barrier(CLK_LOCAL_MEM_FENCE);
+
+            event_t tile_copy_event = async_work_group_copy(tx_tile, cl_tx_element_array_descriptor + tile_base, tile_count, 0);
+            wait_group_events(1, &tile_copy_event);
+        }
+
+
+// Adds the pressure that all the transducers of the tile generate at the sampling point.
+// Returns 0 as soon as one of them has no valid output at the point, see hbk_add_tx_contribution.
+
+inline int hbk_add_tx_tile(
+        __local const float16 *tx_tile,                                  // This is the tile in local memory.
+        unsigned int tile_count,                                         // This is the number of transducers in the tile.
+        float pixel_x_coordinate,                                        // These are the coordinates of the sampling point.
+        float pixel_y_coordinate,
+        float pixel_z_coordinate,
+        float medium_wavelength,                                         // This is the wavelength in the medium.
+        float medium_wavenumber,                                         // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
+        float *pressure_re,                                              // These accumulate the pressure at the sampling point.
+        float *pressure_im
+        )
+        {
+
+            for (unsigned int tile_idx=0; tile_idx<tile_count; tile_idx++)
+            {
+                if (!hbk_add_tx_contribution(tx_tile[tile_idx],
+                                             pixel_x_coordinate, pixel_y_coordinate, pixel_z_coordinate,
+                                             medium_wavelength, medium_wavenumber,
+                                             pressure_re, pressure_im))
+                {
+                    return 0;
+                }
+            }
+
+            return 1;
+        }
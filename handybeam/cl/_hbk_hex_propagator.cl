@@ -10,7 +10,9 @@
             float v1x, float v1y, float v1z,                  // These are the coordinates specifying the first unit vector.
             float v2x, float v2y, float v2z,                  // These are the coordinates specifying the second unit vector.
             float lower_limit, float upper_limit,             // These are the limits to help pick out the correct points for the sampling grid. 
-            unsigned int tx_count                             // This is the number of transducers.
+            unsigned int tx_count,                            // This is the number of transducers.
+            float medium_wavelength,                          // This is the wavelength in the medium.
+            float medium_wavenumber                           // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
             )
 
         {
@@ -152,3 +154,89 @@
 
 
         }
+
+
+// This is the tiled variant of _hbk_hex_propagator. The work group stages the transducer descriptors
+// in __local memory, tile_tx_count at a time, instead of each work item reading all of them from global memory.
+
+__kernel void _hbk_hex_propagator_tiled(
+            __global const float16 *cl_tx_element_array_descriptor,   // This is the input buffer for the tx elements.
+            __global float *cl_out_buffer,                    // This is the output buffer for the sampling grid coordinates and pressure values.
+            float side_length,                                // This is the number of sampling points in the sampling grid along one side of the hexagon.
+            float delta,                                      // This is the spacing between adjacent points in the sampling grid.
+            float x0, float y0, float z0,                     // These are the coordinates of the origin.
+            float v1x, float v1y, float v1z,                  // These are the coordinates specifying the first unit vector.
+            float v2x, float v2y, float v2z,                  // These are the coordinates specifying the second unit vector.
+            float lower_limit, float upper_limit,             // These are the limits to help pick out the correct points for the sampling grid.
+            unsigned int tx_count,                            // This is the number of transducers.
+            float medium_wavelength,                          // This is the wavelength in the medium.
+            float medium_wavenumber,                          // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
+            __local float16 *tx_tile,                         // This is the local memory for one tile of transducers.
+            unsigned int tile_tx_count                        // This is the number of transducers that fit in the tile.
+            )
+
+        {
+
+            // Get thread coordinates in the computational grid.
+
+            unsigned int idx_x = get_global_id(0) + 1;
+            unsigned int idx_y = get_global_id(1) + 1;
+
+            // The threads outside of the hexagon have no output, but still help to load the tiles.
+
+            unsigned int index_sum = idx_x + idx_y;
+            unsigned int lower_compare = isless(index_sum, lower_limit);
+            unsigned int upper_compare = isgreater(index_sum,upper_limit);
+
+            int is_grid_point = !(lower_compare | upper_compare);
+
+            // Assign grid coordinates.
+
+            float pixel_x_coordinate = (float) v1x*delta*(idx_x-side_length) + v2x*delta*(idx_y-side_length) + x0 ;
+            float pixel_y_coordinate = (float) v1y*delta*(idx_x-side_length) + v2y*delta*(idx_y-side_length) + y0 ;
+            float pixel_z_coordinate = (float) v1z*delta*(idx_x-side_length) + v2z*delta*(idx_y-side_length) + z0 ;
+
+            // Initialise pressure values
+
+            float pressure_re = (float)0.0;
+            float pressure_im = (float)0.0;
+
+            int is_valid = is_grid_point;
+
+            // Iterate through the tiles of transducers.
+
+            for (unsigned int tile_base=0; tile_base<tx_count; tile_base+=tile_tx_count)
+            {
+                unsigned int tile_count = min(tile_tx_count, tx_count - tile_base);
+
+                hbk_load_tx_tile(tx_tile, cl_tx_element_array_descriptor, tile_base, tile_count);
+
+                if (is_valid)
+                {
+                    is_valid = hbk_add_tx_tile(tx_tile, tile_count,
+                                               pixel_x_coordinate, pixel_y_coordinate, pixel_z_coordinate,
+                                               medium_wavelength, medium_wavenumber,
+                                               &pressure_re, &pressure_im);
+                }
+            }
+
+            if (!is_grid_point)
+            {
+                return;
+            }
+
+            if (!is_valid)
+            {
+                pressure_re = NAN;
+                pressure_im = NAN;
+            }
+
+            unsigned int output_pointer_base = 5 * ( idx_x - 1 ) + (5 * (  ( 2 * side_length ) - 1 )  * ( idx_y - 1 )  );
+
+            cl_out_buffer[output_pointer_base+0] = pixel_x_coordinate;
+            cl_out_buffer[output_pointer_base+1] = pixel_y_coordinate;
+            cl_out_buffer[output_pointer_base+2] = pixel_z_coordinate;
+            cl_out_buffer[output_pointer_base+3] = pressure_re;
+            cl_out_buffer[output_pointer_base+4] = pressure_im;
+
+        }
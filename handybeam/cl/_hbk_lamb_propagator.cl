@@ -7,7 +7,9 @@ __kernel void _hbk_lamb_propagator(
             float N,                                            // This is the length of the square grid that gets projected to the hemisphere.
             float density,                                      // This defines the density of the sampling grid.
             float x0, float y0, float z0,                       // These are the coordinates of the origin.
-            unsigned int tx_count                               // This is the number of transducers.
+            unsigned int tx_count,                              // This is the number of transducers.
+            float medium_wavelength,                            // This is the wavelength in the medium.
+            float medium_wavenumber                             // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
           )
           {
 
@@ -158,3 +160,92 @@ __kernel void _hbk_lamb_propagator(
 
             }
 
+
+
+// This is the tiled variant of _hbk_lamb_propagator. The work group stages the transducer descriptors
+// in __local memory, tile_tx_count at a time, instead of each work item reading all of them from global memory.
+
+__kernel void _hbk_lamb_propagator_tiled(
+            __global float *cl_out_buffer,                      // This is the output buffer for the sampling grid coordinates and pressure values.
+            __global const float16 *cl_tx_element_array_descriptor,   // This is the input buffer for the tx elements.
+            float radius,                                       // This is the radius of the hemisphere.
+            float N,                                            // This is the length of the square grid that gets projected to the hemisphere.
+            float density,                                      // This defines the density of the sampling grid.
+            float x0, float y0, float z0,                       // These are the coordinates of the origin.
+            unsigned int tx_count,                              // This is the number of transducers.
+            float medium_wavelength,                            // This is the wavelength in the medium.
+            float medium_wavenumber,                            // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
+            __local float16 *tx_tile,                           // This is the local memory for one tile of transducers.
+            unsigned int tile_tx_count                          // This is the number of transducers that fit in the tile.
+          )
+
+          {
+
+            // Get thread coordinates in the computational grid.
+
+            unsigned int idx_x = get_global_id(0);
+            unsigned int idx_y = get_global_id(1);
+
+            // Project the square grid onto the hemisphere - see _hbk_lamb_propagator.
+
+            float x_base = (-1 + density * idx_x ) * root_2;
+            float y_base = (-1 + density * idx_y ) * root_2;
+
+            float rho = sqrt(x_base * x_base + y_base * y_base);
+            float c = 2 * asin(0.5*rho);
+            float phi = asin(cos(c)) / rho;
+            float l = atan2( (x_base * sin(c)), -y_base*sin(c));
+            float cos_phi = cos(phi);
+
+            float pixel_z_coordinate = radius * sin(phi);
+            float pixel_x_coordinate = radius * cos(l) * cos_phi;
+            float pixel_y_coordinate = radius * sin(l) * cos_phi;
+
+            // The threads below the plane have no output, but still help to load the tiles.
+
+            int is_grid_point = !(pixel_z_coordinate < 0);
+
+            // Initialise pressure values
+
+            float pressure_re = (float)0.0;
+            float pressure_im = (float)0.0;
+
+            int is_valid = is_grid_point;
+
+            // Iterate through the tiles of transducers.
+
+            for (unsigned int tile_base=0; tile_base<tx_count; tile_base+=tile_tx_count)
+            {
+                unsigned int tile_count = min(tile_tx_count, tx_count - tile_base);
+
+                hbk_load_tx_tile(tx_tile, cl_tx_element_array_descriptor, tile_base, tile_count);
+
+                if (is_valid)
+                {
+                    is_valid = hbk_add_tx_tile(tx_tile, tile_count,
+                                               pixel_x_coordinate, pixel_y_coordinate, pixel_z_coordinate,
+                                               medium_wavelength, medium_wavenumber,
+                                               &pressure_re, &pressure_im);
+                }
+            }
+
+            if (!is_grid_point)
+            {
+                return;
+            }
+
+            if (!is_valid)
+            {
+                pressure_re = NAN;
+                pressure_im = NAN;
+            }
+
+            unsigned int output_pointer_base = 5 * idx_x + (5 * N * idx_y );
+
+            cl_out_buffer[output_pointer_base+0] = pixel_x_coordinate;
+            cl_out_buffer[output_pointer_base+1] = pixel_y_coordinate;
+            cl_out_buffer[output_pointer_base+2] = pixel_z_coordinate;
+            cl_out_buffer[output_pointer_base+3] = pressure_re;
+            cl_out_buffer[output_pointer_base+4] = pressure_im;
+
+          }
@@ -10,7 +10,9 @@ __kernel void _hbk_rect_propagator(
             float x0, float y0, float z0,                     // These are the coordinates of the origin.
             float v1x, float v1y, float v1z,                  // These are the coordinates specifying the first unit vector.
             float v2x, float v2y, float v2z,                  // These are the coordinates specifying the second unit vector.
-            unsigned int tx_count                             // This is the number of transducers.
+            unsigned int tx_count,                            // This is the number of transducers.
+            float medium_wavelength,                          // This is the wavelength in the medium.
+            float medium_wavenumber                           // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
             )
 
             {
@@ -147,4 +149,161 @@ __kernel void _hbk_rect_propagator(
                 cl_out_buffer[output_pointer_base+3] = pressure_re;
                 cl_out_buffer[output_pointer_base+4] = pressure_im;
 
-            }
\ No newline at end of file
+            }
+
+// This is the tiled variant of _hbk_rect_propagator. The work group stages the transducer descriptors
+// in __local memory, tile_tx_count at a time, instead of each work item reading all of them from global memory.
+
+__kernel void _hbk_rect_propagator_tiled(
+            __global const float16 *cl_tx_element_array_descriptor,   // This is the input buffer for the tx elements.
+            __global float *cl_out_buffer,                    // This is the output buffer for the sampling grid coordinates and pressure values.
+            float x_lim,                                      // This is half the number of sampling points in the sampling grid along the x-axis.
+            float y_lim,                                      // This is half the number of sampling points in the sampling grid along the y-axis.
+            float delta,                                      // This is the spacing between adjacent points in the sampling grid.
+            float x0, float y0, float z0,                     // These are the coordinates of the origin.
+            float v1x, float v1y, float v1z,                  // These are the coordinates specifying the first unit vector.
+            float v2x, float v2y, float v2z,                  // These are the coordinates specifying the second unit vector.
+            unsigned int tx_count,                            // This is the number of transducers.
+            float medium_wavelength,                          // This is the wavelength in the medium.
+            float medium_wavenumber,                          // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
+            __local float16 *tx_tile,                         // This is the local memory for one tile of transducers.
+            unsigned int tile_tx_count                        // This is the number of transducers that fit in the tile.
+            )
+
+            {
+
+                // Set limits
+
+                float N_x = x_lim * 2;
+
+                // Get thread coordinates in the computational grid.
+
+                unsigned int idx_x = get_global_id(0);
+                unsigned int idx_y = get_global_id(1);
+
+                // Assign grid coordinates.
+
+                float pixel_x_coordinate = (float) v1x*delta*(idx_x-x_lim) + v2x*delta*(idx_y-y_lim) + x0;
+                float pixel_y_coordinate = (float) v1y*delta*(idx_x-x_lim) + v2y*delta*(idx_y-y_lim) + y0;
+                float pixel_z_coordinate = (float) v1z*delta*(idx_x-x_lim) + v2z*delta*(idx_y-y_lim) + z0;
+
+                // Initialise pressure values
+
+                float pressure_re = (float)0.0;
+                float pressure_im = (float)0.0;
+
+                int is_valid = 1;
+
+                // Iterate through the tiles of transducers.
+
+                for (unsigned int tile_base=0; tile_base<tx_count; tile_base+=tile_tx_count)
+                {
+                    unsigned int tile_count = min(tile_tx_count, tx_count - tile_base);
+
+                    hbk_load_tx_tile(tx_tile, cl_tx_element_array_descriptor, tile_base, tile_count);
+
+                    if (is_valid)
+                    {
+                        is_valid = hbk_add_tx_tile(tx_tile, tile_count,
+                                                   pixel_x_coordinate, pixel_y_coordinate, pixel_z_coordinate,
+                                                   medium_wavelength, medium_wavenumber,
+                                                   &pressure_re, &pressure_im);
+                    }
+                }
+
+                if (!is_valid)
+                {
+                    pressure_re = NAN;
+                    pressure_im = NAN;
+                }
+
+                unsigned int output_pointer_base = 5 * idx_x + (5 * N_x * idx_y );
+
+                cl_out_buffer[output_pointer_base+0] = pixel_x_coordinate;
+                cl_out_buffer[output_pointer_base+1] = pixel_y_coordinate;
+                cl_out_buffer[output_pointer_base+2] = pixel_z_coordinate;
+                cl_out_buffer[output_pointer_base+3] = pressure_re;
+                cl_out_buffer[output_pointer_base+4] = pressure_im;
+
+            }
+
+
+// These are the blocked variants of _hbk_rect_propagator. Each thread computes points_per_item neighbouring
+// points along the x-axis, so that each transducer loaded from global memory is used points_per_item times.
+// The global work size along x is N_x / points_per_item, rounded up - the points past the edge of the grid are skipped.
+// The macro defines one kernel per block size, so that the per-point accumulators can stay in registers.
+
+#define HBK_RECT_PROPAGATOR_BLOCKED(kernel_name, points_per_item)                                              \
+__kernel void kernel_name(                                                                                     \
+            __global const float16 *cl_tx_element_array_descriptor, /* This is the input buffer for the tx elements. */     \
+            __global float *cl_out_buffer,                    /* This is the output buffer for the sampling grid.   */     \
+            float x_lim,                                      /* This is half the number of sampling points along x. */    \
+            float y_lim,                                      /* This is half the number of sampling points along y. */    \
+            float delta,                                      /* This is the spacing between adjacent points.        */    \
+            float x0, float y0, float z0,                     /* These are the coordinates of the origin.            */    \
+            float v1x, float v1y, float v1z,                  /* These are the coordinates of the first unit vector. */    \
+            float v2x, float v2y, float v2z,                  /* These are the coordinates of the second unit vector.*/    \
+            unsigned int tx_count,                            /* This is the number of transducers.                  */    \
+            float medium_wavelength,                          /* This is the wavelength in the medium.               */    \
+            float medium_wavenumber                           /* This is the wavenumber in the medium.               */    \
+            )                                                                                                  \
+            {                                                                                                  \
+                float N_x = x_lim * 2;                                                                         \
+                                                                                                               \
+                unsigned int first_idx_x = get_global_id(0) * points_per_item;                                 \
+                unsigned int idx_y = get_global_id(1);                                                         \
+                                                                                                               \
+                float pixel_x_coordinate[points_per_item];                                                     \
+                float pixel_y_coordinate[points_per_item];                                                     \
+                float pixel_z_coordinate[points_per_item];                                                     \
+                float pressure_re[points_per_item];                                                            \
+                float pressure_im[points_per_item];                                                            \
+                int is_valid[points_per_item];                                                                 \
+                                                                                                               \
+                for (unsigned int point_idx=0; point_idx<points_per_item; point_idx++)                         \
+                {                                                                                              \
+                    unsigned int idx_x = first_idx_x + point_idx;                                              \
+                    pixel_x_coordinate[point_idx] = (float) v1x*delta*(idx_x-x_lim) + v2x*delta*(idx_y-y_lim) + x0; \
+                    pixel_y_coordinate[point_idx] = (float) v1y*delta*(idx_x-x_lim) + v2y*delta*(idx_y-y_lim) + y0; \
+                    pixel_z_coordinate[point_idx] = (float) v1z*delta*(idx_x-x_lim) + v2z*delta*(idx_y-y_lim) + z0; \
+                    pressure_re[point_idx] = (float)0.0;                                                       \
+                    pressure_im[point_idx] = (float)0.0;                                                       \
+                    is_valid[point_idx] = 1;                                                                   \
+                }                                                                                              \
+                                                                                                               \
+                for (unsigned int tx_idx=0; tx_idx<tx_count; tx_idx++)                                         \
+                {                                                                                              \
+                    float16 tx = cl_tx_element_array_descriptor[tx_idx];                                       \
+                                                                                                               \
+                    for (unsigned int point_idx=0; point_idx<points_per_item; point_idx++)                     \
+                    {                                                                                          \
+                        if (is_valid[point_idx])                                                               \
+                        {                                                                                      \
+                            is_valid[point_idx] = hbk_add_tx_contribution(tx,                                  \
+                                        pixel_x_coordinate[point_idx], pixel_y_coordinate[point_idx], pixel_z_coordinate[point_idx], \
+                                        medium_wavelength, medium_wavenumber,                                  \
+                                        &pressure_re[point_idx], &pressure_im[point_idx]);                     \
+                        }                                                                                      \
+                    }                                                                                          \
+                }                                                                                              \
+                                                                                                               \
+                for (unsigned int point_idx=0; point_idx<points_per_item; point_idx++)                         \
+                {                                                                                              \
+                    unsigned int idx_x = first_idx_x + point_idx;                                              \
+                                                                                                               \
+                    if (idx_x < N_x)                                                                           \
+                    {                                                                                          \
+                        unsigned int output_pointer_base = 5 * idx_x + (5 * N_x * idx_y );                     \
+                                                                                                               \
+                        cl_out_buffer[output_pointer_base+0] = pixel_x_coordinate[point_idx];                  \
+                        cl_out_buffer[output_pointer_base+1] = pixel_y_coordinate[point_idx];                  \
+                        cl_out_buffer[output_pointer_base+2] = pixel_z_coordinate[point_idx];                  \
+                        cl_out_buffer[output_pointer_base+3] = is_valid[point_idx] ? pressure_re[point_idx] : NAN; \
+                        cl_out_buffer[output_pointer_base+4] = is_valid[point_idx] ? pressure_im[point_idx] : NAN; \
+                    }                                                                                          \
+                }                                                                                              \
+            }
+
+HBK_RECT_PROPAGATOR_BLOCKED(_hbk_rect_propagator_blocked2, 2)
+HBK_RECT_PROPAGATOR_BLOCKED(_hbk_rect_propagator_blocked4, 4)
+HBK_RECT_PROPAGATOR_BLOCKED(_hbk_rect_propagator_blocked8, 8)
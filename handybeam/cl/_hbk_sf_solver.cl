@@ -5,7 +5,8 @@ __kernel void _hbk_sf_solver(
             __global float *cl_output_buffer,               // This is the output buffer for the transducer information.
             float focal_x_coordinate,                       // This is the x coordinate of the desired focal point.
             float focal_y_coordinate,                       // This is the y coordinate of the desired focal point.
-            float focal_z_coordinate                        // This is the z coordinate of the desired focal point.
+            float focal_z_coordinate,                       // This is the z coordinate of the desired focal point.
+            float medium_wavenumber                         // This is the wavenumber in the medium, i.e. 1/medium_wavelength.
           )
 
           {
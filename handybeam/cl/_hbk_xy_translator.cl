@@ -5,7 +5,8 @@ __kernel void _hbk_xy_translator(
             __global float *cl_output_buffer,               // This is the output buffer for the transducer information.
             float x_translate,                              // This is the distance to translate the focal points in the x-axis.
             float y_translate,                              // This is the distance to translate the focal points in the y-axis.
-            float plane_height_recp                         // This is the distance along the z-axis between the transducer array and the focal plane.
+            float plane_height_recp,                        // This is the distance along the z-axis between the transducer array and the focal plane.
+            float translation_medium_wavenumber             // This is the angular wavenumber in the medium, i.e. tau/medium_wavelength.
           )
 
           {
@@ -8,7 +8,8 @@ __kernel void _hbk_xyz_translator(
             float focal_z_coordinate,                       // This is the z coordinate of the focal point to be translated.
             float x_translate,                              // This is the distance to translate the focal points in the x-axis.
             float y_translate,                              // This is the distance to translate the focal points in the y-axis.
-            float z_translate                               // This is the distance to translate the focal points in the z-axis.
+            float z_translate,                              // This is the distance to translate the focal points in the z-axis.
+            float translation_medium_wavenumber             // This is the angular wavenumber in the medium, i.e. tau/medium_wavelength.
           )
 
           {
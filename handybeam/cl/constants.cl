@@ -2,7 +2,3 @@
 #define tau 6.283185307179586f
 #define root_2 1.4142135623730951f
 #define pi_over_2 1.5707963267948966f
-#define medium_wavelength 0.008575f
-#define medium_wavenumber 116.61807758509084f
-#define translation_medium_wavenumber 732.7329916341719f
-#define emission_frequency 40000
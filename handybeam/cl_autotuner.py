@@ -0,0 +1,447 @@
+"""
+.. _cl_autotuner:
+
+.. -------------------------------------
+   Module :code:`handybeam.cl_autotuner`
+   -------------------------------------
+
+Chooses the local work size (the work-group shape) of the OpenCL kernels for the current device.
+
+The first time a kernel is launched with a given problem size on a given device, a set of candidate
+work-group shapes - and, where there is more than one kernel for the job, the kernel variants -
+is timed with the real arguments, and the fastest one is stored in a JSON file
+next to :code:`cl_platform_config.ini`. All the later launches - also in other processes - use the stored winner.
+
+The candidates respect :code:`CL_KERNEL_WORK_GROUP_SIZE` of the compiled kernel and
+:code:`CL_DEVICE_MAX_WORK_ITEM_SIZES` of the device.
+
+"""
+
+# Imports
+
+import json
+import os
+import threading
+import warnings
+import pyopencl as cl
+
+# Global variables
+
+cl_autotune_cache_file_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cl_autotune_cache.json')
+""" string: full path of the file to store the autotuning results in. Set to :code:`None` to keep them in memory only.
+
+The results are keyed by device, kernel and problem size bucket. It is safe to delete this file at any time.
+"""
+
+autotune_enabled = True
+""" boolean: if False, no candidates are timed, and the heuristic default of :code:`Autotuner.default_local_work_size` is used.
+"""
+
+autotune_repeats = 2
+""" integer: count of the timed launches per candidate. The shortest one counts.
+"""
+
+_cache = None
+""" dictionary: the content of the cache file, loaded on first use. See :code:`load_cache`.
+"""
+
+_cache_lock = threading.Lock()
+
+
+def load_cache():
+    """ Returns the autotuning results, reading them from :code:`cl_autotune_cache_file_name` on the first call.
+
+    A missing or unreadable file gives an empty cache.
+
+    """
+
+    global _cache
+
+    with _cache_lock:
+
+        if _cache is None:
+            _cache = {}
+            if cl_autotune_cache_file_name is not None and os.path.isfile(cl_autotune_cache_file_name):
+                try:
+                    with open(cl_autotune_cache_file_name, 'r') as f:
+                        _cache = json.load(f)
+                except (IOError, ValueError):
+                    warnings.warn('could not read the autotuning results from {}, starting afresh.'.format(cl_autotune_cache_file_name))
+
+        return _cache
+
+
+def store_cache():
+    """ Writes the autotuning results to :code:`cl_autotune_cache_file_name`.
+
+    The file is written to a temporary file first, so that concurrent processes never see a partial file.
+    If the folder is not writable, the results are kept in memory only.
+
+    """
+
+    if cl_autotune_cache_file_name is None:
+        return
+
+    with _cache_lock:
+        try:
+            temporary_file_name = '{}.{}.tmp'.format(cl_autotune_cache_file_name, os.getpid())
+            with open(temporary_file_name, 'w') as f:
+                json.dump(_cache, f, indent=2, sort_keys=True)
+            os.replace(temporary_file_name, cl_autotune_cache_file_name)
+        except (IOError, OSError):
+            warnings.warn('could not store the autotuning results in {}'.format(cl_autotune_cache_file_name))
+
+
+def clear_cache():
+    """ Forgets the autotuning results in memory, so that the next launch reads the file again.
+    """
+
+    global _cache
+
+    with _cache_lock:
+        _cache = None
+
+
+def size_bucket(global_work_size):
+    """ Returns the problem size bucket of :code:`global_work_size`: the count of the work items, rounded up to a power of 2.
+
+    Parameters
+    ----------
+
+    global_work_size : tuple
+        the global work size of the launch.
+
+    """
+
+    work_item_count = 1
+    for size in global_work_size:
+        work_item_count = work_item_count * int(size)
+
+    bucket = 1
+    while bucket < work_item_count:
+        bucket = bucket * 2
+
+    return bucket
+
+
+# Class
+
+class Autotuner():
+    """ Chooses, and remembers, the local work size of the kernels on one device.
+
+    usage: :code:`global_work_size, local_work_size = cl_system.autotuner.work_sizes(kernel, global_work_size, launch)`
+
+    """
+
+    def __init__(self, device):
+        """ Initialises an instance of the Autotuner class.
+
+        Parameters
+        ----------
+
+        device : pyopencl.Device
+            the device that the kernels run on.
+
+        """
+
+        self.device = device
+        self.device_key = '{} | {} | {}'.format(device.platform.name, device.name, device.driver_version)
+        self.max_work_item_sizes = [int(size) for size in device.max_work_item_sizes]
+
+    def max_work_group_size(self, kernel):
+        """ Returns the largest work group that :code:`kernel` can be launched with on this device.
+
+        Parameters
+        ----------
+
+        kernel : pyopencl.Kernel
+            the compiled kernel.
+
+        """
+
+        return int(kernel.get_work_group_info(cl.kernel_work_group_info.WORK_GROUP_SIZE, self.device))
+
+    def fits(self, kernel, global_work_size, local_work_size, pad_global_work_size):
+        """ Returns True if :code:`local_work_size` can be used to launch :code:`kernel` over :code:`global_work_size`.
+
+        Parameters
+        ----------
+
+        kernel : pyopencl.Kernel
+            the compiled kernel.
+        global_work_size : tuple
+            the global work size, before the padding.
+        local_work_size : tuple
+            the candidate local work size.
+        pad_global_work_size : boolean
+            if False, the local work size has to divide the global work size in each dimension.
+
+        """
+
+        group_size = 1
+        for dimension, size in enumerate(local_work_size):
+            if size > self.max_work_item_sizes[dimension]:
+                return False
+            if not pad_global_work_size and global_work_size[dimension] % size != 0:
+                return False
+            group_size = group_size * size
+
+        return group_size <= self.max_work_group_size(kernel)
+
+    def default_local_work_size(self, kernel, global_work_size, pad_global_work_size=False):
+        """ Returns the local work size used without timing: the largest fitting work group along the first dimension.
+
+        Parameters
+        ----------
+
+        kernel : pyopencl.Kernel
+            the compiled kernel.
+        global_work_size : tuple
+            the global work size, before the padding.
+        pad_global_work_size : boolean
+            if False, the local work size has to divide the global work size in each dimension.
+
+        """
+
+        size = min(self.max_work_group_size(kernel), self.max_work_item_sizes[0])
+
+        if pad_global_work_size:
+            # No point in a work group larger than the problem.
+            size = min(size, max(int(global_work_size[0]), 1))
+
+        while size > 1 and not self.fits(kernel, global_work_size, (size, 1, 1), pad_global_work_size):
+            size = size - 1
+
+        return (size, 1, 1)
+
+    def candidates(self, kernel, global_work_size, pad_global_work_size=False):
+        """ Returns the local work sizes to time for :code:`kernel` over :code:`global_work_size`.
+
+        These are the powers of 2 from 16 along the first dimension, a few 2D tiles of 64 to 256 work items
+        for 2D problems, and the default of :code:`default_local_work_size` - all of them limited by the kernel and device.
+
+        Parameters
+        ----------
+
+        kernel : pyopencl.Kernel
+            the compiled kernel.
+        global_work_size : tuple
+            the global work size, before the padding.
+        pad_global_work_size : boolean
+            if False, the local work size has to divide the global work size in each dimension.
+
+        """
+
+        max_work_group_size = self.max_work_group_size(kernel)
+
+        shapes = [self.default_local_work_size(kernel, global_work_size, pad_global_work_size)]
+
+        size = min(16, max_work_group_size)
+        while size <= max_work_group_size:
+            shapes.append((size, 1, 1))
+            size = size * 2
+
+        if global_work_size[1] > 1:
+            shapes.extend([(8, 8, 1), (16, 8, 1), (32, 8, 1), (16, 16, 1)])
+
+        candidates = []
+        for shape in shapes:
+            if shape not in candidates and self.fits(kernel, global_work_size, shape, pad_global_work_size):
+                candidates.append(shape)
+
+        return candidates
+
+    def work_sizes(self, kernel, global_work_size, launch, pad_global_work_size=False):
+        """ Returns the global and local work size to launch :code:`kernel` with, autotuning on the first call.
+
+        If there is no stored result for this device, kernel and problem size bucket, each of the candidates
+        is launched via :code:`launch` and timed with the profiling events of the queue. The fastest is stored.
+
+        A stored local work size that does not fit the current problem (e.g. does not divide it)
+        is reduced along the first dimension until it does.
+
+        Parameters
+        ----------
+
+        kernel : pyopencl.Kernel
+            the compiled kernel.
+        global_work_size : tuple
+            the global work size that covers the problem.
+        launch : function
+            called as :code:`launch(global_work_size, local_work_size)`, enqueues the kernel with the real arguments,
+            on a queue with profiling enabled, and returns the event. The kernel must be safe to launch repeatedly.
+        pad_global_work_size : boolean
+            if True, the global work size is rounded up to a multiple of the local work size,
+            and the kernel must skip the work items outside of the problem.
+            Otherwise, the local work size has to divide the global work size.
+
+        Returns
+        -------
+
+        tuple
+            :code:`(global_work_size, local_work_size)`, ready for the launch.
+
+        """
+
+        global_work_size = tuple(int(size) for size in global_work_size) + (1,) * (3 - len(global_work_size))
+
+        if not autotune_enabled:
+            local_work_size = self.default_local_work_size(kernel, global_work_size, pad_global_work_size)
+            return self.padded(global_work_size, local_work_size), local_work_size
+
+        cache = load_cache()
+        key = '{}'.format(size_bucket(global_work_size))
+
+        with _cache_lock:
+            stored = cache.get(self.device_key, {}).get(kernel.function_name, {}).get(key)
+
+        if stored is None:
+            stored = self.time_candidates(kernel, global_work_size, launch, pad_global_work_size)
+
+            with _cache_lock:
+                cache.setdefault(self.device_key, {}).setdefault(kernel.function_name, {})[key] = list(stored)
+
+            store_cache()
+
+        local_work_size = tuple(stored)
+
+        # The bucket covers a range of sizes - make the stored shape fit this one.
+
+        while local_work_size[0] > 1 and not self.fits(kernel, global_work_size, local_work_size, pad_global_work_size):
+            local_work_size = (local_work_size[0] - 1,) + local_work_size[1:]
+
+        if not self.fits(kernel, global_work_size, local_work_size, pad_global_work_size):
+            local_work_size = self.default_local_work_size(kernel, global_work_size, pad_global_work_size)
+
+        return self.padded(global_work_size, local_work_size), local_work_size
+
+    def time_candidates(self, kernel, global_work_size, launch, pad_global_work_size):
+        """ Launches :code:`kernel` with each of the candidate local work sizes, and returns the fastest one.
+
+        Candidates that the device refuses to launch are skipped.
+
+        Parameters
+        ----------
+
+        kernel : pyopencl.Kernel
+            the compiled kernel.
+        global_work_size : tuple
+            the global work size, before the padding.
+        launch : function
+            see :code:`work_sizes`.
+        pad_global_work_size : boolean
+            see :code:`work_sizes`.
+
+        """
+
+        candidates = self.candidates(kernel, global_work_size, pad_global_work_size)
+
+        best_local_work_size = candidates[0]
+        best_time = None
+
+        for local_work_size in candidates:
+            padded_global_work_size = self.padded(global_work_size, local_work_size)
+            try:
+                # The first launch of the first candidate also pays for the warm up.
+                if best_time is None:
+                    launch(padded_global_work_size, local_work_size).wait()
+
+                elapsed_time = None
+                for _ in range(autotune_repeats):
+                    event = launch(padded_global_work_size, local_work_size)
+                    event.wait()
+                    launch_time = event.profile.end - event.profile.start
+                    if elapsed_time is None or launch_time < elapsed_time:
+                        elapsed_time = launch_time
+
+                    # No need to repeat a clear loser.
+                    if best_time is not None and elapsed_time > 2 * best_time:
+                        break
+            except cl.Error:
+                continue
+
+            if best_time is None or elapsed_time < best_time:
+                best_time = elapsed_time
+                best_local_work_size = local_work_size
+
+        return best_local_work_size
+
+    def select_variant(self, name, global_work_size, variants):
+        """ Returns the label of the fastest of several variants of a computation, timing them on the first call.
+
+        This is used where there is more than one kernel for the same job, e.g. with different counts of
+        points per work item. The winner is stored like the local work sizes, under :code:`name` and the problem size bucket.
+
+        Parameters
+        ----------
+
+        name : string
+            the name to store the result under.
+        global_work_size : tuple
+            the global work size of the computation, used for the problem size bucket.
+        variants : dictionary
+            maps the label of each variant (an integer or a string) to a function that launches it -
+            with its own autotuned work sizes - and returns the event.
+
+        """
+
+        if len(variants) == 1 or not autotune_enabled:
+            return next(iter(variants))
+
+        cache = load_cache()
+        key = '{}'.format(size_bucket(global_work_size))
+
+        with _cache_lock:
+            stored = cache.get(self.device_key, {}).get(name, {}).get(key)
+
+        if stored in variants:
+            return stored
+
+        best_label = None
+        best_time = None
+
+        for label, launch in variants.items():
+            try:
+                # The first launch autotunes the work sizes of the variant, and warms it up.
+                launch().wait()
+
+                elapsed_time = None
+                for _ in range(autotune_repeats):
+                    event = launch()
+                    event.wait()
+                    launch_time = event.profile.end - event.profile.start
+                    if elapsed_time is None or launch_time < elapsed_time:
+                        elapsed_time = launch_time
+            except cl.Error:
+                continue
+
+            if best_time is None or elapsed_time < best_time:
+                best_time = elapsed_time
+                best_label = label
+
+        if best_label is None:
+            return next(iter(variants))
+
+        with _cache_lock:
+            cache.setdefault(self.device_key, {}).setdefault(name, {})[key] = best_label
+
+        store_cache()
+
+        return best_label
+
+    @staticmethod
+    def padded(global_work_size, local_work_size):
+        """ Returns :code:`global_work_size` rounded up to a multiple of :code:`local_work_size` in each dimension.
+
+        Parameters
+        ----------
+
+        global_work_size : tuple
+            the global work size.
+        local_work_size : tuple
+            the local work size.
+
+        """
+
+        return tuple(-(-int(size) // int(local_size)) * int(local_size)
+                     for size, local_size in zip(global_work_size, local_work_size))
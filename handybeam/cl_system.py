@@ -15,10 +15,14 @@ these include e.g. beam forming coefficient solvers, propagators, e.t.c
 # Imports
 
 import configparser
+import hashlib
 import os
+import warnings
+import threading
 import pyopencl as cl
 import numpy as np
 import handybeam
+import handybeam.cl_autotuner
 
 # Global variables
 
@@ -26,6 +30,162 @@ cl_config_file_name = 'cl_platform_config.ini'
 """ string: constant, file name to store the configuration of the OpenCL subsystem.
 """
 
+cl_binary_cache_folder = os.path.join(os.path.expanduser('~'), '.handybeam', 'cl_binary_cache')
+""" string: folder to store the compiled OpenCL program binaries in. Set to :code:`None` to disable the cache.
+
+The binaries are keyed by a hash of the source text, the device and driver version,
+and the build options, so a stale binary is never loaded. It is safe to delete this folder at any time.
+"""
+
+async_queue_count = 2
+""" integer: count of the in-order queues that the asynchronous propagations are spread over.
+
+With more than one, the upload of the next frame can overlap with the kernel of the current one.
+"""
+
+tx_descriptor_row_nbytes = 16 * 4
+""" integer: size of one row of the transducer descriptor, i.e. of one transducer, in bytes.
+"""
+
+blocked_kernel_points_per_work_item = (2, 4, 8)
+""" tuple: the counts of points per work item of the blocked propagation kernels, e.g. :code:`_hbk_rect_propagator_blocked4`.
+"""
+
+_shared_cl_systems = {}
+""" dictionary: the OpenCL systems shared by all the wrappers in this process. See :code:`get_shared_cl_system`.
+"""
+
+_shared_cl_systems_lock = threading.Lock()
+
+
+class BufferPool():
+    """ Keeps the OpenCL buffers that are no longer needed, and hands them out again for the next call of the same size.
+
+    This removes the allocation churn from repeated propagations of the same grid.
+
+    Two kinds of memory are pooled:
+
+    * device buffers - keyed by their size in bytes and their memory flags.
+    * page-locked (pinned) host arrays - allocated with :code:`ALLOC_HOST_PTR` and mapped into numpy arrays,
+      keyed by shape and dtype. Copies between these and the device run at the full bus speed, and never page-fault.
+
+    usage: :code:`cl_field = pool.acquire(nbytes)`, then :code:`pool.release(cl_field)` once the last command using it completed.
+
+    """
+
+    def __init__(self, context, queue):
+        """ Creates an empty pool.
+
+        Parameters
+        ----------
+
+        context : pyopencl.Context
+            the context to allocate the buffers in.
+        queue : pyopencl.CommandQueue
+            the queue used to map the pinned host arrays.
+
+        """
+
+        self.context = context
+        self.queue = queue
+        self.free_device_buffers = {}
+        self.free_pinned_arrays = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes, flags=cl.mem_flags.READ_WRITE):
+        """ Returns a device buffer of :code:`nbytes` bytes, reusing a released one if there is one.
+
+        The content of the buffer is undefined.
+
+        Parameters
+        ----------
+
+        nbytes : int
+            size of the buffer, in bytes.
+        flags : int
+            :code:`pyopencl.mem_flags` of the buffer. Default: :code:`READ_WRITE`.
+
+        """
+
+        nbytes = max(int(nbytes), 1)
+        key = (nbytes, int(flags))
+
+        with self._lock:
+            free_buffers = self.free_device_buffers.get(key)
+            if free_buffers:
+                return free_buffers.pop()
+
+        return cl.Buffer(self.context, flags, size=nbytes)
+
+    def release(self, buffer):
+        """ Returns a device buffer obtained from :code:`acquire` to the pool.
+
+        Parameters
+        ----------
+
+        buffer : pyopencl.Buffer
+            the buffer. No command that uses it may be pending.
+
+        """
+
+        with self._lock:
+            self.free_device_buffers.setdefault((buffer.size, int(buffer.flags)), []).append(buffer)
+
+    def acquire_pinned_array(self, shape, dtype=np.float32):
+        """ Returns a numpy array in page-locked host memory, reusing a released one if there is one.
+
+        The content of the array is undefined.
+
+        Parameters
+        ----------
+
+        shape : tuple
+            shape of the array.
+        dtype : numpy dtype
+            type of the array elements. Default: :code:`np.float32`.
+
+        """
+
+        shape = tuple(int(n) for n in shape)
+        dtype = np.dtype(dtype)
+        key = (shape, dtype.str)
+
+        with self._lock:
+            free_arrays = self.free_pinned_arrays.get(key)
+            if free_arrays:
+                return free_arrays.pop()
+
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        host_buffer = cl.Buffer(self.context, cl.mem_flags.READ_WRITE | cl.mem_flags.ALLOC_HOST_PTR, size=nbytes)
+
+        # The mapped array keeps the buffer alive, and stays mapped for as long as it exists.
+
+        pinned_array, _ = cl.enqueue_map_buffer(self.queue, host_buffer,
+                                                cl.map_flags.READ | cl.map_flags.WRITE,
+                                                0, shape, dtype, is_blocking=True)
+        return pinned_array
+
+    def release_pinned_array(self, pinned_array):
+        """ Returns an array obtained from :code:`acquire_pinned_array` to the pool.
+
+        Parameters
+        ----------
+
+        pinned_array : numpy array
+            the array. It must not be used by the caller after this.
+
+        """
+
+        with self._lock:
+            self.free_pinned_arrays.setdefault((pinned_array.shape, pinned_array.dtype.str), []).append(pinned_array)
+
+    def clear(self):
+        """ Forgets all the released buffers and arrays, so that their memory can be freed."""
+
+        with self._lock:
+            self.free_device_buffers.clear()
+            self.free_pinned_arrays.clear()
+
 
 class OpenCLSystem():
     """ initializes the OpenCL subsystem, stores session info
@@ -40,7 +200,9 @@ class OpenCLSystem():
                  use_this_config_file_full_path=None,
                  use_platform=0,
                  use_device=0,
-                 print_feedback=False):
+                 print_feedback=False,
+                 use_binary_cache=True,
+                 build_options=()):
         """ Boots the OpenCL subsystem.
 
         Selects the execution device, compiles the source codes e.t.c.
@@ -54,6 +216,8 @@ class OpenCLSystem():
         use_platform : DESCRIPTION HERE
         use_device : DESCRIPTION HERE
         print_feedback : DESCRIPTION HERE
+        use_binary_cache : if :code:`True`, the compiled program is stored in, and loaded from, :code:`cl_binary_cache_folder`.
+        build_options : sequence of strings, options passed to the OpenCL compiler.
 
         """
 
@@ -74,12 +238,18 @@ class OpenCLSystem():
         self.use_platform = use_platform
         self.use_device = use_device
         self.print_feedback = print_feedback
+        self.use_binary_cache = use_binary_cache
+        self.build_options = list(build_options)
         self.compiled_kernels = None
         self.platforms = None
         self.device = None
         self.devices = None
         self.context = None
         self.queue = None
+        self.async_queues = []
+        self.next_async_queue_index = 0
+        self.buffer_pool = None
+        self.autotuner = None
 
         self.checks_and_feedback()
  
@@ -88,8 +258,6 @@ class OpenCLSystem():
 
         .. TODO:: Note To Salvador. Your automatically generated docstrings are actually NOT compatible with the Numpy standard.
 
-        .. TODO:: Currently, the constants are written to a file, and then reloaded and compiled. Replace this method with a dynamic templating system.
-
         See the: `numpydoc docstring guide <https://numpydoc.readthedocs.io/en/latest/format.html>`_
 
         DESCRIPTION HERE
@@ -119,52 +287,224 @@ class OpenCLSystem():
         self.context = cl.Context(devices=[self.device])
         self.queue = cl.CommandQueue(self.context, device=self.device,
                                      properties=cl.command_queue_properties.PROFILING_ENABLE)
+        self.async_queues = [cl.CommandQueue(self.context, device=self.device,
+                                             properties=cl.command_queue_properties.PROFILING_ENABLE)
+                             for _ in range(async_queue_count)]
+        self.buffer_pool = BufferPool(self.context, self.queue)
+        self.autotuner = handybeam.cl_autotuner.Autotuner(self.device)
 
         if self.print_feedback:
             print('. Compiling kernels...', end='')
        
-        entire_source_text = ''
-
-        constants_path = os.path.join(this_folder,'cl/constants.cl')
+        # The medium properties are kernel arguments, so the program does not depend on the world,
+        # and nothing is written into the package folder.
 
-        if self.parent is not None:
-            with open(constants_path, 'w') as f:
+        with open(os.path.join(this_folder, 'cl/constants.cl'), 'r') as f:
+            entire_source_text = f.read()
 
-                f.write('\n#define tau ' + str(2*np.pi) + 'f\n')
-                f.write('#define root_2 ' + str(1.4142135623730951) + 'f\n')
-                f.write('#define pi_over_2 ' + str(1.5707963267948966) + 'f\n')
-                f.write('#define medium_wavelength ' + str(self.parent.medium_wavelength) + 'f\n')
-                f.write('#define medium_wavenumber ' + str(self.parent.medium_wavenumber) + 'f\n')
-                f.write('#define translation_medium_wavenumber ' + str(self.parent.medium_wavenumber * 2*np.pi) + 'f\n')
-                f.write('#define emission_frequency ' + str(self.parent.frequency) + '\n')
+        # The functions shared by the kernels have to be defined before them.
 
-        with open(constants_path, 'r') as f:
-            kernel_text = f.read()
+        with open(os.path.join(this_folder, 'cl/_hbk_common.cl'), 'r') as f:
+            entire_source_text += f.read()
 
-        entire_source_text += kernel_text
+        # Sorted, so that the source text - and with it, the binary cache key - is the same in every process.
 
-        for source_file in self.__kernel_sources:
+        for source_file in sorted(self.__kernel_sources):
             kernel_source_file_name = os.path.join(this_folder, source_file)
             with open(kernel_source_file_name,'r') as f:
                 kernel_text = f.read()
 
             entire_source_text += kernel_text
 
-        combined_kernels_filename = os.path.join(this_folder, 'combined_kernels.tmp.cl')
-
-        with open(combined_kernels_filename,'w') as f:
-            
-            combined_kernels_file_length = f.write(entire_source_text)
-        
         if self.print_feedback:
-            print(' {:0.0f}kB sources... '.format(combined_kernels_file_length / 1024), end='')
+            print(' {:0.0f}kB sources... '.format(len(entire_source_text) / 1024), end='')
         
         # self.print_current_device(endtype='')
-        self.compiled_kernels = cl.Program(self.context, entire_source_text).build()
+        self.compiled_kernels = self.build_program(entire_source_text)
 
         if self.print_feedback:
             print(', done.')
 
+    def binary_cache_file_name(self, source_text):
+        """ Returns the full path of the cache file for the program built from :code:`source_text` on the current device.
+
+        Parameters
+        ----------
+
+        source_text : string
+            the complete source of the program.
+
+        """
+
+        key = hashlib.sha256()
+        for key_part in (source_text,
+                         self.platform.name,
+                         self.platform.version,
+                         self.device.name,
+                         self.device.version,
+                         self.device.driver_version,
+                         ' '.join(self.build_options)):
+            key.update(key_part.encode('utf-8'))
+            key.update(b'\0')
+
+        return os.path.join(cl_binary_cache_folder, '{}.bin'.format(key.hexdigest()))
+
+    def build_program(self, source_text):
+        """ Builds the program from :code:`source_text`, reusing the binary from the on-disk cache if available.
+
+        On a cache miss, the program is compiled from source, and its binary is stored for the next time.
+        A cache file that can not be loaded is ignored and overwritten.
+
+        Parameters
+        ----------
+
+        source_text : string
+            the complete source of the program.
+
+        Returns
+        -------
+
+        pyopencl.Program
+            the built program.
+
+        """
+
+        if not self.use_binary_cache or cl_binary_cache_folder is None:
+            return cl.Program(self.context, source_text).build(options=self.build_options)
+
+        cache_file_name = self.binary_cache_file_name(source_text)
+
+        if os.path.isfile(cache_file_name):
+            try:
+                with open(cache_file_name, 'rb') as f:
+                    binary = f.read()
+                program = cl.Program(self.context, [self.device], [binary]).build(options=self.build_options)
+                if self.print_feedback:
+                    print(' loaded from binary cache ', end='')
+                return program
+            except (IOError, cl.Error):
+                warnings.warn('could not load the cached OpenCL binary {}, rebuilding.'.format(cache_file_name))
+
+        program = cl.Program(self.context, source_text).build(options=self.build_options)
+
+        # Store the binary. Write to a temporary file first, so that concurrent processes never see a partial file.
+
+        try:
+            binary = program.get_info(cl.program_info.BINARIES)[0]
+            os.makedirs(cl_binary_cache_folder, exist_ok=True)
+            temporary_file_name = '{}.{}.tmp'.format(cache_file_name, os.getpid())
+            with open(temporary_file_name, 'wb') as f:
+                f.write(binary)
+            os.replace(temporary_file_name, cache_file_name)
+        except (IOError, OSError, cl.Error):
+            warnings.warn('could not store the OpenCL binary in {}'.format(cl_binary_cache_folder))
+
+        return program
+
+    def tx_array_buffer(self, tx_array):
+        """ Returns the device-resident copy of :code:`tx_array.tx_array_element_descriptor`, uploading only what changed.
+
+        The buffer is created on the first call, and kept in :code:`tx_array.device_buffers` for this context.
+        On later calls, the descriptor is compared with the last uploaded copy, and only the range of rows
+        that differ is re-uploaded. If :code:`tx_array.track_in_place_changes` is False,
+        the comparison is skipped unless :code:`tx_array.generation` changed.
+
+        The comparison is done bit-wise, so that the NaN padding columns compare as equal.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+            the array to get the descriptor buffer of.
+
+        Returns
+        -------
+
+        pyopencl.Buffer
+            read-only buffer with the :code:`(N,16)` float32 descriptor.
+
+        """
+
+        descriptor = np.ascontiguousarray(tx_array.tx_array_element_descriptor, dtype=np.float32)
+
+        cached = tx_array.device_buffers.get(self.context)
+
+        if cached is None or cached['uploaded_copy'].shape != descriptor.shape:
+            cached = {'buffer': cl.Buffer(self.context, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR, hostbuf=descriptor),
+                      'uploaded_copy': descriptor.copy(),
+                      'generation': tx_array.generation,
+                      'reader_events': []}
+            tx_array.device_buffers[self.context] = cached
+            return cached['buffer']
+
+        if cached['generation'] == tx_array.generation and not tx_array.track_in_place_changes:
+            return cached['buffer']
+
+        changed_rows = np.flatnonzero(np.any(descriptor.view(np.uint32) != cached['uploaded_copy'].view(np.uint32), axis=1))
+
+        if changed_rows.size > 0:
+            first_row = changed_rows[0]
+            last_row = changed_rows[-1] + 1
+
+            # Kernels enqueued asynchronously, on other queues, may still be reading the previous descriptor.
+
+            cl.enqueue_copy(self.queue, cached['buffer'], descriptor[first_row:last_row],
+                            dst_offset=int(first_row * descriptor.strides[0]),
+                            wait_for=cached['reader_events'] or None)
+            cached['uploaded_copy'][first_row:last_row] = descriptor[first_row:last_row]
+            cached['reader_events'] = []
+
+        cached['generation'] = tx_array.generation
+
+        return cached['buffer']
+
+    def add_tx_array_buffer_reader(self, tx_array, event):
+        """ Records that the command of :code:`event` reads the buffer returned by :code:`tx_array_buffer`.
+
+        The next update of that buffer waits for the command to complete.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+            the array whose descriptor buffer is read.
+        event : pyopencl.Event
+            the event of the command that reads it.
+
+        """
+
+        cached = tx_array.device_buffers[self.context]
+        cached['reader_events'] = [reader_event for reader_event in cached['reader_events']
+                                   if reader_event.command_execution_status != cl.command_execution_status.COMPLETE]
+        cached['reader_events'].append(event)
+
+    def tx_tile_size(self, tx_count):
+        """ Returns the count of transducers that the tiled propagation kernels stage in local memory at once.
+
+        Half of the local memory of the device is used, so that more than one work group can be resident
+        on a compute unit. A smaller array is staged in one tile.
+
+        Parameters
+        ----------
+
+        tx_count : int
+            count of the transducers in the array.
+
+        """
+
+        return max(1, min(int(tx_count), self.device.local_mem_size // (2 * tx_descriptor_row_nbytes)))
+
+    def next_async_queue(self):
+        """ Returns the next of the :code:`async_queues`, round-robin.
+
+        Consecutive asynchronous propagations go to different in-order queues, so that they can overlap.
+
+        """
+
+        queue = self.async_queues[self.next_async_queue_index % len(self.async_queues)]
+        self.next_async_queue_index = self.next_async_queue_index + 1
+        return queue
+
     def print_current_device(self, end='\n'):
         """ Reports on the currently selected device.
 
@@ -227,6 +567,59 @@ class OpenCLSystem():
                   all_kernels[idx].function_name,
                   '(', all_kernels[idx].num_args, 'arguments )')
 
+def get_shared_cl_system(parent=None, use_platform=0, use_device=0, print_feedback=False):
+    """ Returns the OpenCL system for the given device, creating it on the first call.
+
+    All the wrappers of a world - propagator, solver, translator - share one context, one queue and one program,
+    so the program is only built once per process, and device buffers can be handed from one stage to the next.
+    The medium properties are passed to the kernels at every call, so all the worlds on the same device share it too.
+
+    usage: :code:`cl_system = handybeam.cl_system.get_shared_cl_system(parent=world, use_platform=0, use_device=0)`
+
+    Parameters
+    ----------
+
+    parent : handybeam.world.World
+        link to the parent object, passed on to :code:`OpenCLSystem` when a new system is created.
+    use_platform : integer
+        platform ID number.
+    use_device : integer
+        device ID number.
+    print_feedback : boolean
+        passed on to :code:`OpenCLSystem` when a new system is created.
+
+    Returns
+    -------
+
+    OpenCLSystem
+        the shared OpenCL system.
+
+    """
+
+    with _shared_cl_systems_lock:
+
+        key = (use_platform, use_device)
+
+        if key not in _shared_cl_systems:
+            _shared_cl_systems[key] = OpenCLSystem(parent=parent,
+                                                   use_platform=use_platform,
+                                                   use_device=use_device,
+                                                   print_feedback=print_feedback)
+
+        return _shared_cl_systems[key]
+
+
+def clear_shared_cl_systems():
+    """ Forgets the shared OpenCL systems, so that the next :code:`get_shared_cl_system` creates a new one.
+
+    The contexts are released once the wrappers that still use them are deleted.
+
+    """
+
+    with _shared_cl_systems_lock:
+        _shared_cl_systems.clear()
+
+
 def print_cl_platforms():
     """ print the available OpenCL platforms.
 
@@ -0,0 +1,15 @@
+"""
+
+This module contains propagation engines that run on the CPU without OpenCL.
+
+They provide the same methods as :class:`handybeam.opencl_wrappers.propagator_wrappers.Propagator`,
+so that the samplers work unchanged. Select them with the :code:`backend` argument of
+:class:`handybeam.world.World`.
+
+"""
+
+__all__ = [
+            'grid_coordinates',
+            'numba_propagator',
+            'numpy_propagator'
+            ]
@@ -0,0 +1,176 @@
+"""
+
+Host-side replicas of the sampling grid generators built into the OpenCL propagation kernels.
+
+Each function returns the coordinates as a flat :code:`(count, 3)` float32 array, ordered the same way as the
+kernels write their output buffer, i.e. the result can be reshaped directly into the buffer layout returned by
+the corresponding propagator mixin.
+
+"""
+
+# # Imports
+
+import numpy as np
+
+# # Global variables
+
+root_2 = np.float32(1.4142135623730951)
+
+# # Functions
+
+
+def rect_grid_coordinates(N_x, N_y, delta, x0, y0, z0, vx1, vy1, vz1, vx2, vy2, vz2):
+    """ Generates the coordinates of the points of a rectilinear sampling grid.
+
+    Replicates the coordinate generation of :code:`_hbk_rect_propagator.cl`.
+
+    Parameters
+    ----------
+
+    N_x : int
+            The number of sampling points along the first grid vector.
+    N_y : int
+            The number of sampling points along the second grid vector.
+    delta : numpy float
+            Distance between adjacent sampling grid points.
+    x0, y0, z0 : numpy float
+            The coordinates of the origin of the sampling grid.
+    vx1, vy1, vz1 : numpy float
+            The components of the first unit vector that parameterises the sampling grid.
+    vx2, vy2, vz2 : numpy float
+            The components of the second unit vector that parameterises the sampling grid.
+
+    Returns
+    -------
+
+    numpy array
+            :code:`(N_x*N_y, 3)` float32 array, point :code:`(idx_x, idx_y)` is stored at row :code:`idx_x + N_x*idx_y`.
+
+    """
+
+    delta = np.float32(delta)
+
+    # The kernel uses the index offset from the grid centre.
+
+    offset_x = np.arange(N_x, dtype=np.float32) - np.float32(N_x / 2)
+    offset_y = np.arange(N_y, dtype=np.float32) - np.float32(N_y / 2)
+
+    # Rows are ordered with idx_x changing fastest.
+
+    step_1 = (delta * offset_x)[np.newaxis, :]
+    step_2 = (delta * offset_y)[:, np.newaxis]
+
+    coordinates = np.empty((N_y, N_x, 3), dtype=np.float32)
+    coordinates[:, :, 0] = np.float32(vx1) * step_1 + np.float32(vx2) * step_2 + np.float32(x0)
+    coordinates[:, :, 1] = np.float32(vy1) * step_1 + np.float32(vy2) * step_2 + np.float32(y0)
+    coordinates[:, :, 2] = np.float32(vz1) * step_1 + np.float32(vz2) * step_2 + np.float32(z0)
+
+    return coordinates.reshape((N_x * N_y, 3))
+
+
+def hex_grid_coordinates(side_length, delta, x0, y0, z0, vx1, vy1, vz1, vx2, vy2, vz2):
+    """ Generates the coordinates of the points of a hexagonal sampling grid.
+
+    Replicates the coordinate generation of :code:`_hbk_hex_propagator.cl`. The kernel works on a
+    :code:`grid_length x grid_length` parallelogram and skips the corners that fall outside of the hexagon.
+
+    Parameters
+    ----------
+
+    side_length : int
+            The number of sampling points along one side of the hexagon.
+    delta : numpy float
+            Distance between adjacent sampling grid points.
+    x0, y0, z0 : numpy float
+            The coordinates of the origin of the sampling grid.
+    vx1, vy1, vz1 : numpy float
+            The components of the first unit vector that parameterises the sampling grid.
+    vx2, vy2, vz2 : numpy float
+            The components of the second unit vector that parameterises the sampling grid.
+
+    Returns
+    -------
+
+    coordinates : numpy array
+            :code:`(grid_length**2, 3)` float32 array in the kernel output order.
+    inside : numpy array
+            boolean array, True for the points that belong to the hexagon.
+
+    """
+
+    grid_length = int(2 * side_length - 1)
+    delta = np.float32(delta)
+    side_length = np.float32(side_length)
+
+    # The kernel indices start from 1.
+
+    idx = np.arange(1, grid_length + 1, dtype=np.float32)
+    idx_x = idx[np.newaxis, :]
+    idx_y = idx[:, np.newaxis]
+
+    index_sum = idx_x + idx_y
+    inside = np.logical_not(np.logical_or(index_sum < side_length + 1, index_sum > 3 * side_length - 1))
+
+    step_1 = delta * (idx_x - side_length)
+    step_2 = delta * (idx_y - side_length)
+
+    coordinates = np.empty((grid_length, grid_length, 3), dtype=np.float32)
+    coordinates[:, :, 0] = np.float32(vx1) * step_1 + np.float32(vx2) * step_2 + np.float32(x0)
+    coordinates[:, :, 1] = np.float32(vy1) * step_1 + np.float32(vy2) * step_2 + np.float32(y0)
+    coordinates[:, :, 2] = np.float32(vz1) * step_1 + np.float32(vz2) * step_2 + np.float32(z0)
+
+    return coordinates.reshape((grid_length * grid_length, 3)), inside.ravel()
+
+
+def lamb_grid_coordinates(radius, N, density):
+    """ Generates the coordinates of the points of a lambert (hemisphere) sampling grid.
+
+    Replicates the coordinate generation of :code:`_hbk_lamb_propagator.cl`.
+    Note that, as in the kernel, the hemisphere is centred at the world origin.
+
+    Parameters
+    ----------
+
+    radius : numpy float
+            The radius of the hemisphere.
+    N : int
+            The length of the square grid that gets projected onto the hemisphere.
+    density : numpy float
+            The spacing of the square grid.
+
+    Returns
+    -------
+
+    coordinates : numpy array
+            :code:`(N*N, 3)` float32 array in the kernel output order.
+    inside : numpy array
+            boolean array, True for the points that the kernel evaluates (the points that are not below z=0).
+
+    """
+
+    N = int(N)
+    density = np.float32(density)
+    radius = np.float32(radius)
+
+    idx = np.arange(N, dtype=np.float32)
+
+    x_base = ((np.float32(-1) + density * idx) * root_2)[np.newaxis, :]
+    y_base = ((np.float32(-1) + density * idx) * root_2)[:, np.newaxis]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = np.sqrt(x_base * x_base + y_base * y_base)
+        c = np.float32(2) * np.arcsin(np.float32(0.5) * rho)
+        phi = np.arcsin(np.cos(c)) / rho
+        sin_c = np.sin(c)
+        l = np.arctan2(x_base * sin_c, -y_base * sin_c)
+        cos_phi = np.cos(phi)
+
+    coordinates = np.empty((N, N, 3), dtype=np.float32)
+    coordinates[:, :, 0] = radius * np.cos(l) * cos_phi
+    coordinates[:, :, 1] = radius * np.sin(l) * cos_phi
+    coordinates[:, :, 2] = radius * np.sin(phi)
+
+    coordinates = coordinates.reshape((N * N, 3))
+    inside = np.logical_not(coordinates[:, 2] < 0)
+
+    return coordinates, inside
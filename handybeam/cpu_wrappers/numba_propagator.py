@@ -0,0 +1,174 @@
+"""
+
+Multi-threaded, compiled CPU propagation engine.
+
+The hot loop of :code:`cl/_hbk_clist_propagator.cl` - one sampling point per iteration, accumulating over all the
+transducers - is compiled with `numba <https://numba.pydata.org/>`_ and spread over all the cores with :code:`prange`.
+The pressure accumulators are scalar locals, so they stay in registers for the whole transducer loop.
+
+Use it via :code:`handybeam.world.World(backend='numba')`. The performance feedback is reported in MRays/sec,
+the same as for the OpenCL propagator, so that the two can be compared directly.
+
+.. note::
+
+    numba is an optional dependency. It is only needed if this backend is selected.
+
+"""
+
+# # Imports
+
+import numpy as np
+import handybeam.tx_array
+from handybeam.cpu_wrappers.numpy_propagator import NumpyPropagator
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# # Global variables
+
+tau = np.float32(2 * np.pi)
+
+# # Functions
+
+
+def _point_list_propagator(tx, points, medium_wavelength, medium_wavenumber, py_out_buffer):
+    """ Compiled core of :class:`NumbaPropagator`. Writes the :code:`(P,2)` result into :code:`py_out_buffer`.
+
+    The body mirrors :code:`_hbk_clist_propagator.cl` line by line, with one sampling point per :code:`prange` iteration.
+    """
+
+    point_count = points.shape[0]
+    tx_count = tx.shape[0]
+
+    for sampling_point_idx in numba.prange(point_count):
+
+        pixel_x_coordinate = points[sampling_point_idx, 0]
+        pixel_y_coordinate = points[sampling_point_idx, 1]
+        pixel_z_coordinate = points[sampling_point_idx, 2]
+
+        pressure_re = np.float32(0.0)
+        pressure_im = np.float32(0.0)
+
+        for tx_idx in range(tx_count):
+
+            delta_x = pixel_x_coordinate - tx[tx_idx, 0]
+            delta_y = pixel_y_coordinate - tx[tx_idx, 1]
+            delta_z = pixel_z_coordinate - tx[tx_idx, 2]
+
+            distance = np.sqrt(delta_x * delta_x + delta_y * delta_y + delta_z * delta_z)
+            recp_distance = np.float32(1.0) / distance
+
+            # There can be no output inside a transducer.
+
+            if medium_wavenumber < recp_distance:
+                pressure_re = np.float32(np.nan)
+                pressure_im = np.float32(np.nan)
+                break
+
+            cosine_of_angle_to_normal = (delta_x * tx[tx_idx, 3]
+                                         + delta_y * tx[tx_idx, 4]
+                                         + delta_z * tx[tx_idx, 5]) * recp_distance
+
+            # There is no signal behind the transducer.
+
+            if cosine_of_angle_to_normal < np.float32(0.0):
+                pressure_re = np.float32(np.nan)
+                pressure_im = np.float32(np.nan)
+                break
+
+            phase_distance_shift_wrapped = np.fmod(tau * medium_wavenumber * distance, tau)
+            amplitude_distance_drop = recp_distance * medium_wavelength
+
+            ca = np.float32(1.0) - cosine_of_angle_to_normal
+            directivity_phase = tx[tx_idx, 6] * ca
+            directivity_amplitude_drop = tx[tx_idx, 7] + tx[tx_idx, 8] * ca + tx[tx_idx, 9] * (ca * ca)
+
+            rx_amplitude = tx[tx_idx, 10] * amplitude_distance_drop * directivity_amplitude_drop
+            rx_phase = tx[tx_idx, 11] + phase_distance_shift_wrapped + directivity_phase
+
+            pressure_re += np.cos(rx_phase) * rx_amplitude
+            pressure_im += np.sin(rx_phase) * rx_amplitude
+
+        py_out_buffer[sampling_point_idx, 0] = pressure_re
+        py_out_buffer[sampling_point_idx, 1] = pressure_im
+
+
+if numba is not None:
+    _point_list_propagator = numba.njit(parallel=True, fastmath=False, cache=True)(_point_list_propagator)
+
+# # Class
+
+
+class NumbaPropagator(NumpyPropagator):
+    """ Compiled, multi-threaded CPU propagator.
+
+    Same interface as :class:`handybeam.opencl_wrappers.propagator_wrappers.Propagator`; the grid
+    generation is inherited from :class:`handybeam.cpu_wrappers.numpy_propagator.NumpyPropagator`.
+
+    Attributes:
+        thread_count (int): count of the threads used by the propagation loop.
+
+    """
+
+    def __init__(self, parent=None, thread_count=None):
+        """ Initialises an instance of the NumbaPropagator class, and compiles the propagation loop.
+
+        Parameters
+        ----------
+
+        parent : handybeam.world.World
+                This is an instance of the handybeam world class.
+        thread_count : int or None
+                count of the threads to use. If None, numba's default is used, i.e. all the cores.
+
+        """
+
+        if numba is None:
+            raise RuntimeError('The numba backend requires numba. Install it with: pip install numba')
+
+        super(NumbaPropagator, self).__init__(parent=parent)
+
+        if thread_count is not None:
+            numba.set_num_threads(thread_count)
+
+        self.thread_count = numba.get_num_threads()
+
+        # Compile now (or load from numba's cache), so that the first propagation does not include the compile time.
+
+        _point_list_propagator(np.zeros((1, 16), dtype=np.float32),
+                               np.zeros((1, 3), dtype=np.float32),
+                               np.float32(1.0), np.float32(1.0),
+                               np.zeros((1, 2), dtype=np.float32))
+
+    def propagate_point_list(self, tx_array: handybeam.tx_array.TxArray, sampling_point_list):
+        """ Computes the pressure at a list of points, using the wavelength of the parent world.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+                This is a handybeam tx_array class.
+        sampling_point_list : numpy array
+                :code:`(P,3)` array of the sampling point coordinates.
+
+        Returns
+        -------
+
+        numpy array
+                :code:`(P,2)` float32 array with the real and imaginary part of the pressure.
+
+        """
+
+        tx = np.ascontiguousarray(tx_array.tx_array_element_descriptor, dtype=np.float32)
+        points = np.ascontiguousarray(sampling_point_list, dtype=np.float32).reshape((-1, 3))
+
+        py_out_buffer = np.empty((points.shape[0], 2), dtype=np.float32)
+
+        _point_list_propagator(tx, points,
+                               np.float32(self.parent.medium_wavelength),
+                               np.float32(self.parent.medium_wavenumber),
+                               py_out_buffer)
+
+        return py_out_buffer
@@ -0,0 +1,457 @@
+"""
+
+Pure-NumPy propagation engine.
+
+Implements the same physics as :code:`cl/_hbk_clist_propagator.cl` (directivity polynomial, :code:`rsqrt` amplitude
+drop, no output inside or behind a transducer), vectorised over blocks of sampling points.
+The work is chunked over (sampling points x transducers), so that the memory used by the temporaries stays bounded
+regardless of the size of the problem.
+
+Use it via :code:`handybeam.world.World(backend='numpy')`.
+
+"""
+
+# # Imports
+
+from timeit import default_timer as timer
+import numpy as np
+import handybeam.tx_array
+import handybeam.opencl_wrappers.abstract_wrapper
+import handybeam.opencl_wrappers.propagation_future
+from handybeam.cpu_wrappers.grid_coordinates import rect_grid_coordinates
+from handybeam.cpu_wrappers.grid_coordinates import hex_grid_coordinates
+from handybeam.cpu_wrappers.grid_coordinates import lamb_grid_coordinates
+
+# # Global variables
+
+tau = np.float32(2 * np.pi)
+
+default_max_rays_per_chunk = 2 ** 20
+""" int: default count of (sampling point, transducer) pairs evaluated at once. Each of them costs ~50 bytes of temporaries."""
+
+# # Functions
+
+
+def numpy_point_list_propagator(tx_array_element_descriptor,
+                                sampling_point_list,
+                                medium_wavelength,
+                                medium_wavenumber,
+                                max_rays_per_chunk=default_max_rays_per_chunk):
+    """ Computes the acoustic pressure at a list of points.
+
+    Parameters
+    ----------
+
+    tx_array_element_descriptor : numpy array
+            the :code:`(N,16)` transducer descriptor. See :class:`handybeam.tx_array.TxArray`.
+    sampling_point_list : numpy array
+            :code:`(P,3)` array of the sampling point coordinates.
+    medium_wavelength : numpy float
+            wavelength in the medium, in meters.
+    medium_wavenumber : numpy float
+            reciprocal of the wavelength, in waves per meter.
+    max_rays_per_chunk : int
+            upper limit of the count of (sampling point, transducer) pairs evaluated at once.
+
+    Returns
+    -------
+
+    numpy array
+            :code:`(P,2)` float32 array with the real and imaginary part of the pressure.
+            Points inside or behind a transducer are set to NaN.
+
+    """
+
+    tx = np.ascontiguousarray(tx_array_element_descriptor, dtype=np.float32)
+    points = np.asarray(sampling_point_list, dtype=np.float32).reshape((-1, 3))
+
+    medium_wavelength = np.float32(medium_wavelength)
+    medium_wavenumber = np.float32(medium_wavenumber)
+
+    point_count = points.shape[0]
+    tx_count = tx.shape[0]
+
+    py_out_buffer = np.zeros((point_count, 2), dtype=np.float32)
+
+    if tx_count == 0:
+        return py_out_buffer
+
+    # Unpack the tx array descriptor once, as row vectors to broadcast against the column of points.
+
+    tx_x, tx_y, tx_z = tx[:, 0], tx[:, 1], tx[:, 2]
+    tx_xnormal, tx_ynormal, tx_znormal = tx[:, 3], tx[:, 4], tx[:, 5]
+    directivity_phase_poly1_c1 = tx[:, 6]
+    directivity_amplitude_poly2_c0 = tx[:, 7]
+    directivity_amplitude_poly2_c1 = tx[:, 8]
+    directivity_amplitude_poly2_c2 = tx[:, 9]
+    tx_amp = tx[:, 10]
+    tx_phase = tx[:, 11]
+
+    points_per_chunk = max(1, int(max_rays_per_chunk) // tx_count)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, point_count, points_per_chunk):
+            stop = min(start + points_per_chunk, point_count)
+            chunk = points[start:stop]
+
+            # Calculate the distance from each transducer to each sampling point.
+
+            delta_x = chunk[:, 0:1] - tx_x
+            delta_y = chunk[:, 1:2] - tx_y
+            delta_z = chunk[:, 2:3] - tx_z
+
+            distance = np.sqrt(delta_x * delta_x + delta_y * delta_y + delta_z * delta_z)
+            recp_distance = np.float32(1.0) / distance
+
+            # Now calculate the cosine of angle using the normal.
+
+            cosine_of_angle_to_normal = (delta_x * tx_xnormal + delta_y * tx_ynormal + delta_z * tx_znormal) * recp_distance
+
+            # There can be no output inside a transducer, and there is no signal behind the transducer.
+
+            invalid = np.any(np.logical_or(medium_wavenumber < recp_distance, cosine_of_angle_to_normal < 0.0), axis=1)
+
+            # Calculate the phase distance shift and the amplitude distance drop.
+
+            phase_distance_shift_wrapped = np.fmod(tau * medium_wavenumber * distance, tau)
+            amplitude_distance_drop = recp_distance * medium_wavelength
+
+            # Apply the directivity function.
+
+            ca = np.float32(1.0) - cosine_of_angle_to_normal
+            directivity_phase = directivity_phase_poly1_c1 * ca
+            directivity_amplitude_drop = directivity_amplitude_poly2_c0 \
+                + directivity_amplitude_poly2_c1 * ca \
+                + directivity_amplitude_poly2_c2 * (ca * ca)
+
+            rx_amplitude = tx_amp * amplitude_distance_drop * directivity_amplitude_drop
+            rx_phase = tx_phase + phase_distance_shift_wrapped + directivity_phase
+
+            # Accumulate the result.
+
+            py_out_buffer[start:stop, 0] = np.sum(np.cos(rx_phase) * rx_amplitude, axis=1)
+            py_out_buffer[start:stop, 1] = np.sum(np.sin(rx_phase) * rx_amplitude, axis=1)
+            py_out_buffer[start:stop][invalid] = np.nan
+
+    return py_out_buffer
+
+
+# # Class
+
+
+class NumpyPropagator(handybeam.opencl_wrappers.abstract_wrapper.Wrapper):
+    """ CPU propagator with the same interface as :class:`handybeam.opencl_wrappers.propagator_wrappers.Propagator`.
+
+    It does not need OpenCL at all, so it can be used on machines without a usable OpenCL platform.
+
+    The wavelength and wavenumber are read from the parent world at every call.
+
+    Attributes:
+        max_rays_per_chunk (int): upper limit of the count of (sampling point, transducer) pairs evaluated at once.
+            Controls the memory footprint of the temporaries.
+
+    """
+
+    def __init__(self, parent=None, max_rays_per_chunk=default_max_rays_per_chunk):
+        """ Initialises an instance of the NumpyPropagator class.
+
+        Parameters
+        ----------
+
+        parent : handybeam.world.World
+                This is an instance of the handybeam world class.
+        max_rays_per_chunk : int
+                upper limit of the count of (sampling point, transducer) pairs evaluated at once.
+
+        """
+
+        super(NumpyPropagator, self).__init__()
+
+        self.parent = parent
+        self.max_rays_per_chunk = max_rays_per_chunk
+
+    def propagate_point_list(self, tx_array: handybeam.tx_array.TxArray, sampling_point_list):
+        """ Computes the pressure at a list of points, using the wavelength of the parent world.
+
+        This is the single place where the field gets computed - the grid propagators generate their
+        points and call this. Engines that subclass this class override this method only.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+                This is a handybeam tx_array class.
+        sampling_point_list : numpy array
+                :code:`(P,3)` array of the sampling point coordinates.
+
+        Returns
+        -------
+
+        numpy array
+                :code:`(P,2)` float32 array with the real and imaginary part of the pressure.
+
+        """
+
+        return numpy_point_list_propagator(tx_array.tx_array_element_descriptor,
+                                           sampling_point_list,
+                                           self.parent.medium_wavelength,
+                                           self.parent.medium_wavenumber,
+                                           max_rays_per_chunk=self.max_rays_per_chunk)
+
+    def clist_propagator(self,
+                         tx_array: handybeam.tx_array.TxArray,
+                         sampling_point_list=np.zeros((0, 3), dtype=np.float32),
+                         local_work_size=None,
+                         print_performance_feedback=False,
+                         out=None,
+                         blocking=True
+                         ):
+        """ Simulates the acoustic pressure field on a set of provided sampling points.
+
+        Same as :meth:`handybeam.propagator_mixins.clist_propagator.ClistPropMixin.clist_propagator`.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+                This is a handybeam tx_array class.
+        sampling_point_list : numpy array
+                Numpy array containing the list of requested sampling point coordinates.
+        local_work_size : tuple
+                Ignored, present for compatibility with the OpenCL propagator.
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the performance.
+        out : numpy array or None
+                If given, the float32 array to write the result into. Otherwise, a new array is returned.
+        blocking : boolean
+                If False, the result is returned wrapped in an already completed
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture`.
+
+        """
+
+        t_start = timer()
+
+        py_out_buffer = self.propagate_point_list(tx_array, sampling_point_list)
+
+        if out is not None:
+            self.check_output_buffer(out, py_out_buffer.shape)[...] = py_out_buffer
+            py_out_buffer = out
+
+        t_elapsed_wall_time = timer() - t_start
+
+        if print_performance_feedback:
+            ray_count = float(tx_array.element_count * py_out_buffer.shape[0])
+            self.print_cpu_performance_feedback(t_elapsed_wall_time, ray_count, py_out_buffer.data.nbytes)
+
+        if not blocking:
+            return handybeam.opencl_wrappers.propagation_future.PropagationFuture(result=py_out_buffer)
+
+        return py_out_buffer
+
+    def rect_propagator(self,
+                        tx_array: handybeam.tx_array.TxArray,
+                        N_x,
+                        N_y,
+                        delta,
+                        x0, y0, z0,
+                        vx1, vy1, vz1,
+                        vx2, vy2, vz2,
+                        local_work_size=None,
+                        print_performance_feedback=None,
+                        out=None,
+                        blocking=True
+                        ):
+        """ Simulates the acoustic pressure field on a rectilinear sampling grid.
+
+        Same as :meth:`handybeam.propagator_mixins.rect_propagator.RectPropMixin.rect_propagator`,
+        including the layout of the returned :code:`(N_x, N_y, 5)` buffer.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+                This is a handybeam tx_array class.
+        N_x, N_y : numpy int
+                The number of sampling points along the two vectors of the sampling grid.
+        delta : numpy float
+                Distance between adjacent sampling grid points.
+        x0, y0, z0 : numpy float
+                The coordinates of the origin of the sampling grid.
+        vx1, vy1, vz1 : numpy float
+                The components of the first unit vector that parameterises the sampling grid.
+        vx2, vy2, vz2 : numpy float
+                The components of the second unit vector that parameterises the sampling grid.
+        local_work_size : tuple
+                Ignored, present for compatibility with the OpenCL propagator.
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the performance.
+        out : numpy array or None
+                If given, the float32 array to write the result into. Otherwise, a new array is returned.
+        blocking : boolean
+                If False, the result is returned wrapped in an already completed
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture`.
+
+        """
+
+        t_start = timer()
+
+        N_x = int(N_x)
+        N_y = int(N_y)
+
+        coordinates = rect_grid_coordinates(N_x, N_y, delta, x0, y0, z0, vx1, vy1, vz1, vx2, vy2, vz2)
+
+        if out is None:
+            py_out_buffer = np.empty((N_x * N_y, 5), dtype=np.float32)
+        else:
+            py_out_buffer = self.check_output_buffer(out, (N_x, N_y, 5)).reshape((N_x * N_y, 5))
+        py_out_buffer[:, 0:3] = coordinates
+        py_out_buffer[:, 3:5] = self.propagate_point_list(tx_array, coordinates)
+        py_out_buffer = py_out_buffer.reshape((N_x, N_y, 5))
+
+        t_elapsed_wall_time = timer() - t_start
+
+        if print_performance_feedback:
+            ray_count = float(tx_array.element_count * N_x * N_y)
+            self.print_cpu_performance_feedback(t_elapsed_wall_time, ray_count, py_out_buffer.data.nbytes)
+
+        if not blocking:
+            return handybeam.opencl_wrappers.propagation_future.PropagationFuture(result=py_out_buffer)
+
+        return py_out_buffer
+
+    def hex_propagator(self,
+                       tx_array: handybeam.tx_array.TxArray,
+                       side_length,
+                       delta,
+                       x0, y0, z0,
+                       vx1, vy1, vz1,
+                       vx2, vy2, vz2,
+                       local_work_size=None,
+                       print_performance_feedback=None,
+                       out=None,
+                       blocking=True
+                       ):
+        """ Simulates the acoustic pressure field on a hexagonal sampling grid.
+
+        Same as :meth:`handybeam.propagator_mixins.hex_propagator.HexPropMixin.hex_propagator`.
+        The entries of the buffer that fall outside of the hexagon are left at zero.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+                This is a handybeam tx_array class.
+        side_length : numpy float / numpy int
+                This assigns the side length of the hexagonal sampling grid.
+        delta : numpy float
+                Distance between adjacent sampling grid points.
+        x0, y0, z0 : numpy float
+                The coordinates of the origin of the sampling grid.
+        vx1, vy1, vz1 : numpy float
+                The components of the first unit vector that parameterises the sampling grid.
+        vx2, vy2, vz2 : numpy float
+                The components of the second unit vector that parameterises the sampling grid.
+        local_work_size : tuple
+                Ignored, present for compatibility with the OpenCL propagator.
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the performance.
+        out : numpy array or None
+                If given, the float32 array to write the result into. Otherwise, a new array is returned.
+        blocking : boolean
+                If False, the result is returned wrapped in an already completed
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture`.
+
+        """
+
+        t_start = timer()
+
+        grid_length = int(2 * side_length - 1)
+
+        coordinates, inside = hex_grid_coordinates(side_length, delta, x0, y0, z0, vx1, vy1, vz1, vx2, vy2, vz2)
+
+        if out is None:
+            py_out_buffer = np.zeros((grid_length * grid_length, 5), dtype=np.float32)
+        else:
+            py_out_buffer = self.check_output_buffer(out, (grid_length, grid_length, 5)).reshape((grid_length * grid_length, 5))
+            py_out_buffer.fill(0.0)
+        py_out_buffer[inside, 0:3] = coordinates[inside]
+        py_out_buffer[inside, 3:5] = self.propagate_point_list(tx_array, coordinates[inside])
+        py_out_buffer = py_out_buffer.reshape((grid_length, grid_length, 5))
+
+        t_elapsed_wall_time = timer() - t_start
+
+        if print_performance_feedback:
+            ray_count = float(tx_array.element_count * np.count_nonzero(inside))
+            self.print_cpu_performance_feedback(t_elapsed_wall_time, ray_count, py_out_buffer.data.nbytes)
+
+        if not blocking:
+            return handybeam.opencl_wrappers.propagation_future.PropagationFuture(result=py_out_buffer)
+
+        return py_out_buffer
+
+    def lamb_propagator(self,
+                        tx_array: handybeam.tx_array.TxArray,
+                        radius,
+                        N,
+                        delta,
+                        x0, y0, z0,
+                        local_work_size=None,
+                        print_performance_feedback=None,
+                        out=None,
+                        blocking=True
+                        ):
+        """ Simulates the acoustic pressure field on a lambert sampling grid.
+
+        Same as :meth:`handybeam.propagator_mixins.lamb_propagator.LambPropMixin.lamb_propagator`.
+        The entries of the buffer for the points below z=0 are left at zero.
+
+        Parameters
+        ----------
+
+        tx_array : handybeam.tx_array.TxArray
+                This is a handybeam tx_array class.
+        radius : numpy float / numpy int
+                This assigns the radius of the hemisphere sampling grid.
+        N : numpy float / numpy int
+                The length of the square grid that gets projected onto the hemisphere.
+        delta : numpy float
+                The spacing of the square grid.
+        x0, y0, z0 : numpy float
+                Ignored, as in the OpenCL kernel.
+        local_work_size : tuple
+                Ignored, present for compatibility with the OpenCL propagator.
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the performance.
+        out : numpy array or None
+                If given, the float32 array to write the result into. Otherwise, a new array is returned.
+        blocking : boolean
+                If False, the result is returned wrapped in an already completed
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture`.
+
+        """
+
+        t_start = timer()
+
+        N = int(N)
+
+        coordinates, inside = lamb_grid_coordinates(radius, N, delta)
+
+        if out is None:
+            py_out_buffer = np.zeros((N * N, 5), dtype=np.float32)
+        else:
+            py_out_buffer = self.check_output_buffer(out, (N, N, 5)).reshape((N * N, 5))
+            py_out_buffer.fill(0.0)
+        py_out_buffer[inside, 0:3] = coordinates[inside]
+        py_out_buffer[inside, 3:5] = self.propagate_point_list(tx_array, coordinates[inside])
+        py_out_buffer = py_out_buffer.reshape((N, N, 5))
+
+        t_elapsed_wall_time = timer() - t_start
+
+        if print_performance_feedback:
+            ray_count = float(tx_array.element_count * np.count_nonzero(inside))
+            self.print_cpu_performance_feedback(t_elapsed_wall_time, ray_count, py_out_buffer.data.nbytes)
+
+        if not blocking:
+            return handybeam.opencl_wrappers.propagation_future.PropagationFuture(result=py_out_buffer)
+
+        return py_out_buffer
@@ -6,6 +6,7 @@ for the propagator_mixins, solver_mixins and translator_mixins modules.
 """
 
 __all__ = [
+            'propagation_future',
             'propagator_wrappers',
             'solver_wrappers',
             'translator_wrappers'
@@ -1,5 +1,6 @@
 ## Imports
 
+import numpy as np
 import handybeam
 
 ## Class
@@ -68,3 +69,79 @@ class Wrapper():
                                                                             measured_mem_copy_fps))
         print('profiling: memcopy bandwidth: {:0.1f}[GB/sec]'.format(measured_memory_copy_bandwidth_GBPS))
         print('profiling: command bandwidth: {:0.1f}[CPS]'.format(measured_command_bandwidth))
+
+    def print_cpu_performance_feedback(self,
+                                       t_elapsed_wall_time,
+                                       ray_count,
+                                       output_buffer_size
+                                       ):
+
+        ''' Counterpart of :meth:`print_performance_feedback` for the propagators that run on the CPU.
+
+        There are no OpenCL events to profile, so the compute performance is measured against the wall time.
+
+        Parameters
+        ----------
+
+        t_elapsed_wall_time : float
+                            time taken by the whole call, in seconds.
+        ray_count : float
+                            count of (sampling point, transducer) pairs evaluated.
+        output_buffer_size : int
+                            size of the returned buffer, in bytes.
+
+        '''
+
+        measured_compute_performance = ray_count / t_elapsed_wall_time
+
+        print('profiling: info:')
+        print('profiling: wall time: {:0.4f}[sec] == {:0.1f}[FPS]'.format(t_elapsed_wall_time, 1.0 / t_elapsed_wall_time))
+        print('profiling: compute performance: {:0.1f}[MRays/sec]'.format(measured_compute_performance * 1e-6))
+        print('profiling: output buffer: {:0.1f}[kB]'.format(output_buffer_size / 1024.0))
+
+    def empty_output_buffer(self, shape, dtype=np.float32):
+
+        ''' Returns a host array suitable for the :code:`out` argument of the propagators.
+
+        Callers that propagate repeatedly keep this array, and pass it back in every time.
+        This implementation returns a plain numpy array; the OpenCL wrappers return page-locked memory.
+
+        Parameters
+        ----------
+
+        shape : tuple
+                shape of the array.
+        dtype : numpy dtype
+                type of the array elements. Default: :code:`np.float32`.
+
+        '''
+
+        return np.zeros(shape, dtype=dtype)
+
+    def check_output_buffer(self, out, shape, dtype=np.float32):
+
+        ''' Makes sure that the :code:`out` array passed by the caller can receive the result directly.
+
+        Parameters
+        ----------
+
+        out : numpy array
+                the array passed by the caller.
+        shape : tuple
+                the shape of the result.
+        dtype : numpy dtype
+                the type of the result. Default: :code:`np.float32`.
+
+        Returns
+        -------
+
+        numpy array
+                :code:`out`, unchanged.
+
+        '''
+
+        if out.shape != tuple(shape) or out.dtype != np.dtype(dtype) or not out.flags['C_CONTIGUOUS']:
+            raise RuntimeError('out must be a C-contiguous {} array of shape {}, got {} of shape {}.'.format(
+                np.dtype(dtype), tuple(shape), out.dtype, out.shape))
+
+        return out
@@ -0,0 +1,98 @@
+## Imports
+
+import pyopencl as cl
+
+## Class
+
+class PropagationFuture():
+
+    '''This is a handle to a propagation that was enqueued, but might not have completed yet.
+
+    It is returned by the propagators when called with :code:`blocking=False`, and by
+    :code:`propagate_async()` of the samplers and of :class:`handybeam.world.World`.
+
+    The host is free to do other work - e.g. to enqueue the next frame - until it calls :code:`result()`.
+
+    example usage:
+
+    .. code-block:: python
+
+        future = sampler.propagate_async()
+        # ... prepare the next frame here ...
+        kernel_output = future.result()
+
+    '''
+
+    def __init__(self, events=(), result=None, dependencies=(), keep_alive=()):
+
+        '''This method intialises an instance of the PropagationFuture class.
+
+        Parameters
+        ----------
+
+        events : sequence of pyopencl.Event
+                the commands that have to complete before the result is ready.
+                Leave empty for work that has already completed, e.g. on the CPU backends.
+        result : object
+                the value returned by :code:`result()`, e.g. the host array that the device copies the field into.
+        dependencies : sequence of PropagationFuture
+                other futures that have to complete before this one.
+        keep_alive : sequence
+                objects that must not be freed before the commands complete, e.g. host arrays being uploaded.
+
+        '''
+
+        self.events = list(events)
+        self.dependencies = list(dependencies)
+        self.keep_alive = list(keep_alive)
+        self.done_callbacks = []
+        self.completed = False
+        self._result = result
+
+    def add_done_callback(self, callback):
+
+        '''Registers a function to be called with the result, once, when :code:`result()` is first called.
+
+        If the result was already collected, the function is called immediately.
+
+        Parameters
+        ----------
+
+        callback : function
+                called as :code:`callback(result)`. Its return value is ignored.
+
+        '''
+
+        if self.completed:
+            callback(self._result)
+        else:
+            self.done_callbacks.append(callback)
+
+    def done(self):
+
+        '''Returns True if all the enqueued commands have completed, without blocking.'''
+
+        return all(event.command_execution_status == cl.command_execution_status.COMPLETE for event in self.events) \
+            and all(dependency.done() for dependency in self.dependencies)
+
+    def result(self):
+
+        '''Blocks until all the enqueued commands have completed, runs the callbacks, and returns the result.'''
+
+        if not self.completed:
+
+            for dependency in self.dependencies:
+                dependency.result()
+
+            if self.events:
+                cl.wait_for_events(self.events)
+
+            self.completed = True
+            self.keep_alive = []
+
+            for callback in self.done_callbacks:
+                callback(self._result)
+
+            self.done_callbacks = []
+
+        return self._result
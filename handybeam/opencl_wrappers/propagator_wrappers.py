@@ -1,5 +1,7 @@
 ## Imports
 
+import numpy as np
+import pyopencl as cl
 import handybeam
 import handybeam.opencl_wrappers.abstract_wrapper
 import handybeam.propagator_mixins
@@ -52,7 +54,19 @@ class Propagator(
         super(Propagator, self).__init__()
 
         self.parent = parent
-        self.cl_system = handybeam.cl_system.OpenCLSystem(parent = self.parent,use_device = self.parent.device, use_platform=self.parent.platform)
+        self.cl_system = handybeam.cl_system.get_shared_cl_system(parent=self.parent, use_device=self.parent.device, use_platform=self.parent.platform)
+
+        # If True, the propagators use the kernel variants that stage the transducer data in local memory,
+        # one tile per work group, rather than having every work item read all of it from global memory.
+        # By default, only where the local memory is dedicated on-chip memory - where it is emulated in
+        # global memory (e.g. most CPU drivers), the staging only adds barriers.
+
+        self.use_local_memory_tiles = self.cl_system.device.local_mem_type == cl.device_local_mem_type.LOCAL
+
+        # The count of sampling points computed by each work item, in the propagators that have blocked kernels.
+        # If None, the fastest of 1 and :code:`handybeam.cl_system.blocked_kernel_points_per_work_item` is autotuned.
+
+        self.points_per_work_item = None
 
         # Run the _register methods for each of mixin classes to initialise the high-performance opencl kernels.
 
@@ -61,3 +75,22 @@ class Propagator(
         self._register_hex_propagator()
         self._register_lamb_propagator()
 
+    def empty_output_buffer(self, shape, dtype=np.float32):
+        '''Returns a page-locked host array suitable for the :code:`out` argument of the propagators.
+
+        The device-to-host copy into page-locked memory runs at the full bus speed.
+        Keep the array, and pass it back in for every propagation of the same size.
+
+        Parameters
+        ----------
+
+        shape : tuple
+            shape of the array.
+        dtype : numpy dtype
+            type of the array elements. Default: :code:`np.float32`.
+
+        '''
+
+        pinned_array = self.cl_system.buffer_pool.acquire_pinned_array(shape, dtype)
+        pinned_array.fill(0)
+        return pinned_array
@@ -42,7 +42,7 @@ class Translator(
         super(Translator, self).__init__()
 
         self.parent = parent
-        self.cl_system = handybeam.cl_system.OpenCLSystem(parent=self.parent,use_device = self.parent.device, use_platform = self.parent.platform)
+        self.cl_system = handybeam.cl_system.get_shared_cl_system(parent=self.parent, use_device=self.parent.device, use_platform=self.parent.platform)
 
         # Run the _register methods for each of mixin classes to initialise the high-performance opencl kernels.
 
@@ -1,9 +1,13 @@
 # # Imports
 
+import functools
 from timeit import default_timer as timer
 import numpy as np
 import pyopencl as cl
-import handybeam .tx_array
+import handybeam.tx_array
+import handybeam.cl_system
+import handybeam.cl_autotuner
+import handybeam.opencl_wrappers.propagation_future
 
 # # Class
 
@@ -21,6 +25,8 @@ class ClistPropMixin():
         """
 
         self._hbk_clist_propagator = None
+        self._hbk_clist_propagator_tiled = None
+        self._hbk_clist_propagator_blocked = {}
 
     def _register_clist_propagator(self):
         """This method assigns the compiled OpenCL propagator kernel _hbk_clist_propagator to this
@@ -28,13 +34,29 @@ class ClistPropMixin():
 
         """
         self._hbk_clist_propagator = self.cl_system.compiled_kernels._hbk_clist_propagator
-        self._hbk_clist_propagator.set_scalar_arg_dtypes([None, None, None, np.uint32, np.uint32])
+        self._hbk_clist_propagator.set_scalar_arg_dtypes([None, None, None, np.uint32, np.uint32, np.float32, np.float32])
+
+        # The tiled variant takes two more arguments: the local memory for the tile, and its size.
+
+        self._hbk_clist_propagator_tiled = self.cl_system.compiled_kernels._hbk_clist_propagator_tiled
+        self._hbk_clist_propagator_tiled.set_scalar_arg_dtypes([None, None, None, np.uint32, np.uint32, np.float32, np.float32, None, np.uint32])
+
+        # The blocked variants, by the count of points per work item. They take the same arguments as the kernel.
+
+        self._hbk_clist_propagator_blocked = {}
+
+        for points_per_work_item in handybeam.cl_system.blocked_kernel_points_per_work_item:
+            blocked_kernel = getattr(self.cl_system.compiled_kernels, '_hbk_clist_propagator_blocked{}'.format(points_per_work_item))
+            blocked_kernel.set_scalar_arg_dtypes([None, None, None, np.uint32, np.uint32, np.float32, np.float32])
+            self._hbk_clist_propagator_blocked[points_per_work_item] = blocked_kernel
 
     def clist_propagator(self,
                          tx_array: handybeam.tx_array.TxArray,
                          sampling_point_list=np.zeros((0, 3), dtype=np.float32),
-                         local_work_size=(128, 1, 1),
-                         print_performance_feedback=False
+                         local_work_size=None,
+                         print_performance_feedback=False,
+                         out=None,
+                         blocking=True
                          ):
 
         """This method simulates the acoustic pressure field on a set of provided sampling points. It does this by
@@ -49,10 +71,17 @@ class ClistPropMixin():
                 This is a handybeam tx_array class. 
         sampling_point_list : numpy array
                 Numpy array containing the list of requested sampling point coordinates.
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), the autotuned
+                work group shape for this device and problem size is used, see :code:`handybeam.cl_autotuner`.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
+        out : numpy array or None
+                If given, the :code:`(P,2)` float32 array to write the result into, e.g. one from
+                :code:`empty_output_buffer`. Otherwise, a new array is returned.
+        blocking : boolean
+                If True (default), wait for the result and return it. Otherwise, return a
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture` straight after enqueueing the work.
 
         """
 
@@ -65,75 +94,154 @@ class ClistPropMixin():
         sampling_point_count = sampling_point_list.shape[0]
         
         # Create a numpy array, of the correct type, to store the pressure values for
-        # acoustic field.
+        # acoustic field - or use the one provided by the caller.
 
-        py_out_buffer = np.zeros((sampling_point_count,2),dtype = np.float32)
+        if out is None:
+            py_out_buffer = np.zeros((sampling_point_count,2),dtype = np.float32)
+        else:
+            py_out_buffer = self.check_output_buffer(out, (sampling_point_count, 2))
 
-        # Create a buffer on the GPU to store the pressure values for the acoustic field.
-        
-        cl_field = cl.Buffer(self.cl_system.context, cl.mem_flags.WRITE_ONLY, py_out_buffer.data.nbytes) 
+        # Get a buffer on the GPU to store the pressure values for the acoustic field from the pool.
 
-        # Create a buffer on the GPU to store the transducer data and copy the data from the CPU (tx_array.tx_array_element_descriptor)
-        # to the GPU.
+        buffer_pool = self.cl_system.buffer_pool
+
+        # Enqueue on the main queue when blocking. Otherwise use the next of the asynchronous queues,
+        # so that consecutive propagations can overlap.
+
+        queue = self.cl_system.queue if blocking else self.cl_system.next_async_queue()
 
-        cl_tx_element_array_descriptor = cl.Buffer(self.cl_system.context, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,hostbuf=tx_array.tx_array_element_descriptor)
+        cl_field = buffer_pool.acquire(py_out_buffer.data.nbytes, cl.mem_flags.WRITE_ONLY)
+
+        # Get the device-resident copy of the transducer data (tx_array.tx_array_element_descriptor).
+        # Only the rows that changed since the last call are uploaded to the GPU.
+
+        cl_tx_element_array_descriptor = self.cl_system.tx_array_buffer(tx_array)
         
-        # Create a buffer on the GPU to store the sampling point data and copy the data from the CPU (sampling_point_list)
+        # Get a buffer on the GPU to store the sampling point data from the pool, and copy the data from the CPU (sampling_point_list)
         # to the GPU.
 
-        cl_sampling_point_list = cl.Buffer(self.cl_system.context,cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,hostbuf=sampling_point_list)
+        cl_sampling_point_list = buffer_pool.acquire(sampling_point_list.nbytes, cl.mem_flags.READ_ONLY)
+
+        cl.enqueue_copy(queue, cl_sampling_point_list, sampling_point_list, is_blocking=False)
         
-        # Set the global work size for the GPU. 
+        # Set the global work size for the GPU - one work item per sampling point.
+        # It is rounded up to a multiple of the local work size below; the kernel skips the extra work items.
+
+        global_work_size = (sampling_point_count, 1, 1)
 
-        global_work_size_x = np.int32(np.ceil((sampling_point_count/local_work_size[0]))*local_work_size[0])
+        # Unless disabled, use the variant that stages the transducer data in local memory, one tile at a time.
 
-        if print_performance_feedback:
-            print('sampling_point_count={}'.format(sampling_point_count))
-            print('global_work_size_x={}'.format(global_work_size_x))
+        if self.use_local_memory_tiles:
+            kernel = self._hbk_clist_propagator_tiled
+            tile_tx_count = self.cl_system.tx_tile_size(tx_array.element_count)
+            tile_arguments = (cl.LocalMemory(tile_tx_count * handybeam.cl_system.tx_descriptor_row_nbytes), np.uint32(tile_tx_count))
+        else:
+            kernel = self._hbk_clist_propagator
+            tile_arguments = ()
 
-        global_work_size_y = 1
-        global_work_size_z = 1
+        # Enqueue the kernel with the initialised queue, work sizes and data.
+        # With more than one point per work item, the blocked kernel computes that many consecutive points of the list.
 
-        global_work_size = [global_work_size_x, global_work_size_y, global_work_size_z]
+        def launch(points_per_work_item, local_work_size=None):
 
-        # Create and execute an OpenCL event with the initialised queue, work sizes and data.
+            if points_per_work_item == 1:
+                variant_kernel = kernel
+                extra_arguments = tile_arguments
+            else:
+                variant_kernel = self._hbk_clist_propagator_blocked[points_per_work_item]
+                extra_arguments = ()
 
-        cl_profiling_kernel_event = self._hbk_clist_propagator(     self.cl_system.queue,  
-                                                                    global_work_size,  
+            variant_global_work_size = (-(-sampling_point_count // points_per_work_item), 1, 1)
+
+            def launch_with(variant_global_work_size, local_work_size):
+
+                return variant_kernel(     queue,  
+                                                                    variant_global_work_size,  
                                                                     local_work_size,  
                                                                     cl_tx_element_array_descriptor,
                                                                     cl_sampling_point_list,
                                                                     cl_field,
                                                                     tx_array.element_count,
-                                                                    sampling_point_count                                                                       
+                                                                    sampling_point_count,
+                                                                    np.float32(self.parent.medium_wavelength),
+                                                                    np.float32(self.parent.medium_wavenumber),
+                                                                    *extra_arguments
                                                                 )
 
-        # Copy the results from the GPU buffer to the associated CPU buffer. 
+            # Unless given, use the fastest work group shape for this device - it is timed on the first call.
 
-        cl_profiling_mem_copy_event = cl.enqueue_copy(self.cl_system.queue, py_out_buffer, cl_field)
-        
-        # Block until the kernel event has completed and then until the copy event has completed. 
+            if local_work_size is None:
+                variant_global_work_size, local_work_size = self.cl_system.autotuner.work_sizes(variant_kernel,
+                                                                                        variant_global_work_size,
+                                                                                        launch_with,
+                                                                                        pad_global_work_size=True)
+            else:
+                variant_global_work_size = handybeam.cl_autotuner.Autotuner.padded(variant_global_work_size, local_work_size)
 
-        cl_profiling_kernel_event.wait()     
+            if print_performance_feedback:
+                print('sampling_point_count={}'.format(sampling_point_count))
+                print('points_per_work_item={}'.format(points_per_work_item))
+                print('global_work_size_x={}'.format(variant_global_work_size[0]))
 
-        cl_profiling_mem_copy_event.wait()
+            return launch_with(variant_global_work_size, local_work_size)
 
-        # End the timer to measure the wall time.
+        # Unless set, use the fastest count of points per work item for this device - it is timed on the first call.
 
-        t_end = timer()
+        points_per_work_item = self.points_per_work_item
 
-        t_elapsed_wall_time = t_end - t_start
-         
-        # If performance feedback requested then print. 
-        
-        if print_performance_feedback:
-            ray_count = float(tx_array.element_count * sampling_point_count)
-            output_buffer_size = py_out_buffer.data.nbytes
-            self.print_performance_feedback(cl_profiling_kernel_event,
-                                            cl_profiling_mem_copy_event,
-                                            t_elapsed_wall_time,
-                                            ray_count,
-                                            output_buffer_size)
-
-        return py_out_buffer
+        if points_per_work_item is None:
+            if local_work_size is None:
+                points_per_work_item = self.cl_system.autotuner.select_variant(
+                                            '_hbk_clist_propagator_points_per_work_item',
+                                            global_work_size,
+                                            {points: functools.partial(launch, points) for points in [1] + sorted(self._hbk_clist_propagator_blocked)})
+            else:
+                points_per_work_item = 1
+
+        # Create and execute an OpenCL event.
+
+        cl_profiling_kernel_event = launch(points_per_work_item, local_work_size)
+
+        # Copy the results from the GPU buffer to the associated CPU buffer, without waiting for it.
+
+        cl_profiling_mem_copy_event = cl.enqueue_copy(queue, py_out_buffer, cl_field, is_blocking=False)
+
+        # The next update of the transducer data on the GPU has to wait for this kernel.
+
+        self.cl_system.add_tx_array_buffer_reader(tx_array, cl_profiling_kernel_event)
+
+        def on_completion(py_out_buffer):
+
+            # Nothing uses the GPU buffers any more - return them to the pool.
+
+            buffer_pool.release(cl_field)
+            buffer_pool.release(cl_sampling_point_list)
+
+            # End the timer to measure the wall time.
+
+            t_elapsed_wall_time = timer() - t_start
+
+            # If performance feedback requested then print.
+
+            if print_performance_feedback:
+                ray_count = float(tx_array.element_count * sampling_point_count)
+                output_buffer_size = py_out_buffer.data.nbytes
+                self.print_performance_feedback(cl_profiling_kernel_event,
+                                                cl_profiling_mem_copy_event,
+                                                t_elapsed_wall_time,
+                                                ray_count,
+                                                output_buffer_size)
+
+        future = handybeam.opencl_wrappers.propagation_future.PropagationFuture(
+                                    events=[cl_profiling_kernel_event, cl_profiling_mem_copy_event],
+                                    result=py_out_buffer,
+                                    keep_alive=[sampling_point_list])
+        future.add_done_callback(on_completion)
+
+        # Block until the kernel event has completed and then until the copy event has completed.
+
+        if blocking:
+            return future.result()
+
+        return future
 
@@ -4,6 +4,8 @@ from timeit import default_timer as timer
 import numpy as np
 import pyopencl as cl
 import handybeam.tx_array
+import handybeam.cl_system
+import handybeam.opencl_wrappers.propagation_future
 
 # # Class
 
@@ -20,6 +22,7 @@ class HexPropMixin():
         """
 
         self._hbk_hex_propagator = None        
+        self._hbk_hex_propagator_tiled = None
 
     def _register_hex_propagator(self):
         """This method assigns the compiled OpenCL propagator kernel _hbk_hex_propagator to this
@@ -34,7 +37,19 @@ class HexPropMixin():
                                                         np.float32,np.float32,np.float32,
                                                         np.float32,np.float32,np.float32, 
                                                         np.float32,np.float32,np.float32,
-                                                        np.float32,np.int32])
+                                                        np.float32,np.int32,
+                                                        np.float32,np.float32])
+
+        # The tiled variant takes two more arguments: the local memory for the tile, and its size.
+
+        self._hbk_hex_propagator_tiled = self.cl_system.compiled_kernels._hbk_hex_propagator_tiled
+        self._hbk_hex_propagator_tiled.set_scalar_arg_dtypes([None,None,
+                                                        np.float32,np.float32,np.float32,
+                                                        np.float32,np.float32,np.float32,
+                                                        np.float32,np.float32,np.float32, 
+                                                        np.float32,np.float32,np.float32,
+                                                        np.float32,np.int32,
+                                                        np.float32,np.float32, None, np.uint32])
 
     def hex_propagator(self,
                        tx_array: handybeam.tx_array.TxArray,
@@ -43,8 +58,10 @@ class HexPropMixin():
                        x0, y0, z0,
                        vx1, vy1, vz1,
                        vx2, vy2, vz2,
-                       local_work_size = (1,1,1),
-                       print_performance_feedback = None
+                       local_work_size = None,
+                       print_performance_feedback = None,
+                       out = None,
+                       blocking = True
                        ):
         """This method simulates the acoustic pressure field on a hexagonal sampling grid. It does this by
         initialising a pressure field buffer on the CPU. It then passes the required information 
@@ -78,10 +95,17 @@ class HexPropMixin():
                 The y-component of the second unit vector that parameterises the sampling grid.
         vz2 : numpy float
                 The z-component of the second unit vector that parameterises the sampling grid.       
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), the autotuned
+                work group shape for this device and problem size is used, see :code:`handybeam.cl_autotuner`.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
+        out : numpy array or None
+                If given, the :code:`(grid_length, grid_length, 5)` float32 array to write the result into, e.g. one from
+                :code:`empty_output_buffer`. Otherwise, a new array is returned.
+        blocking : boolean
+                If True (default), wait for the result and return it. Otherwise, return a
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture` straight after enqueueing the work.
 
         """
 
@@ -110,20 +134,47 @@ class HexPropMixin():
         # the acoustic field. The format is:
         #  ( x,y,z,Real(p),Imag(p) ) 
 
-        py_out_buffer = np.zeros((grid_length,grid_length,5),dtype = np.float32)
+        if out is None:
+            py_out_buffer = np.zeros((grid_length,grid_length,5),dtype = np.float32)
+        else:
+            py_out_buffer = self.check_output_buffer(out, (grid_length, grid_length, 5))
+
+        # Get a buffer on the GPU to store the pressure values for the acoustic field from the pool.
+
+        buffer_pool = self.cl_system.buffer_pool
+
+        # Enqueue on the main queue when blocking. Otherwise use the next of the asynchronous queues,
+        # so that consecutive propagations can overlap.
+
+        queue = self.cl_system.queue if blocking else self.cl_system.next_async_queue()
+
+        cl_field = buffer_pool.acquire(py_out_buffer.data.nbytes, cl.mem_flags.WRITE_ONLY)
 
-        # Create a buffer on the GPU to store the pressure values for the acoustic field.
+        # The kernel skips the points that are outside of the grid - zero them,
+        # so that a reused buffer does not return the results of its previous use there.
 
-        cl_field = cl.Buffer(self.cl_system.context, cl.mem_flags.WRITE_ONLY, py_out_buffer.data.nbytes) 
+        cl.enqueue_fill_buffer(queue, cl_field, np.float32(0.0), 0, py_out_buffer.data.nbytes)
 
-        # Create a buffer on the GPU to store the transducer data and copy the data from the CPU (tx_array.tx_array_element_descriptor)
-        # to the GPU.
+        # Get the device-resident copy of the transducer data (tx_array.tx_array_element_descriptor).
+        # Only the rows that changed since the last call are uploaded to the GPU.
 
-        cl_tx_element_array_descriptor = cl.Buffer(self.cl_system.context, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,hostbuf=tx_array.tx_array_element_descriptor)
+        cl_tx_element_array_descriptor = self.cl_system.tx_array_buffer(tx_array)
         
-        # Create and execute an OpenCL event with the initialised queue, work sizes and data.
+        # Unless disabled, use the variant that stages the transducer data in local memory, one tile at a time.
 
-        cl_profiling_kernel_event = self._hbk_hex_propagator(  self.cl_system.queue,
+        if self.use_local_memory_tiles:
+            kernel = self._hbk_hex_propagator_tiled
+            tile_tx_count = self.cl_system.tx_tile_size(tx_array.element_count)
+            tile_arguments = (cl.LocalMemory(tile_tx_count * handybeam.cl_system.tx_descriptor_row_nbytes), np.uint32(tile_tx_count))
+        else:
+            kernel = self._hbk_hex_propagator
+            tile_arguments = ()
+
+        # Enqueue the kernel with the initialised queue, work sizes and data.
+
+        def launch(global_work_size, local_work_size):
+
+            return kernel(  queue,
                                                                 global_work_size,
                                                                 local_work_size,
                                                                 cl_tx_element_array_descriptor,
@@ -141,35 +192,61 @@ class HexPropMixin():
                                                                 np.float32(vz2),
                                                                 np.float32(lower_limit),
                                                                 np.float32(upper_limit),
-                                                                np.int(tx_count)
+                                                                np.int(tx_count),
+                                                                np.float32(self.parent.medium_wavelength),
+                                                                np.float32(self.parent.medium_wavenumber),
+                                                                *tile_arguments
                                                                 )
 
-        # Copy the results from the GPU buffer to the associated CPU buffer. 
+        # Unless given, use the fastest work group shape for this device - it is timed on the first call.
+
+        if local_work_size is None:
+            global_work_size, local_work_size = self.cl_system.autotuner.work_sizes(kernel,
+                                                                                    global_work_size,
+                                                                                    launch)
+
+        # Create and execute an OpenCL event.
+
+        cl_profiling_kernel_event = launch(global_work_size, local_work_size)
+
+        # Copy the results from the GPU buffer to the associated CPU buffer, without waiting for it.
+
+        cl_profiling_mem_copy_event = cl.enqueue_copy(queue, py_out_buffer, cl_field, is_blocking=False)
+
+        # The next update of the transducer data on the GPU has to wait for this kernel.
+
+        self.cl_system.add_tx_array_buffer_reader(tx_array, cl_profiling_kernel_event)
+
+        def on_completion(py_out_buffer):
 
-        cl_profiling_mem_copy_event = cl.enqueue_copy(self.cl_system.queue,py_out_buffer, cl_field)
+            # Nothing uses the GPU buffer any more - return it to the pool.
 
-        # Block until the kernel event has completed and then until the copy event has completed. 
+            buffer_pool.release(cl_field)
 
-        cl_profiling_kernel_event.wait()          
+            # End the timer to measure the wall time.
 
-        cl_profiling_mem_copy_event.wait()
+            t_elapsed_wall_time = timer() - t_start
 
-        # End the timer to measure the wall time.
+            # If performance feedback requested then print.
 
-        t_end = timer()
+            if print_performance_feedback:
+                ray_count = float(tx_array.element_count )
+                output_buffer_size = py_out_buffer.data.nbytes
+                self.print_performance_feedback(cl_profiling_kernel_event,
+                                                cl_profiling_mem_copy_event,
+                                                t_elapsed_wall_time,
+                                                ray_count,
+                                                output_buffer_size)
 
-        t_elapsed_wall_time = t_end - t_start
+        future = handybeam.opencl_wrappers.propagation_future.PropagationFuture(
+                                    events=[cl_profiling_kernel_event, cl_profiling_mem_copy_event],
+                                    result=py_out_buffer)
+        future.add_done_callback(on_completion)
 
-        # If performance feedback requested then print. 
+        # Block until the kernel event has completed and then until the copy event has completed.
 
-        if print_performance_feedback:
-            ray_count = float(tx_array.element_count )
-            output_buffer_size = py_out_buffer.data.nbytes
-            self.print_performance_feedback(cl_profiling_kernel_event,
-                                            cl_profiling_mem_copy_event,
-                                            t_elapsed_wall_time,
-                                            ray_count,
-                                            output_buffer_size)
+        if blocking:
+            return future.result()
 
-        return py_out_buffer
+        return future
 
@@ -1,9 +1,13 @@
 # # Imports
 
+import functools
 from timeit import default_timer as timer
 import numpy as np
 import pyopencl as cl
 import handybeam.tx_array
+import handybeam.cl_system
+import handybeam.cl_autotuner
+import handybeam.opencl_wrappers.propagation_future
 
 # # Class
 
@@ -20,6 +24,8 @@ class RectPropMixin():
         """
 
         self._hbk_rect_propagator = None        
+        self._hbk_rect_propagator_tiled = None
+        self._hbk_rect_propagator_blocked = {}
 
     def _register_rect_propagator(self):
         """
@@ -35,7 +41,34 @@ class RectPropMixin():
                                                         np.float32,np.float32,np.float32,
                                                         np.float32,np.float32,np.float32, 
                                                         np.float32,np.float32,np.float32,
-                                                        np.int32])
+                                                        np.int32,
+                                                        np.float32,np.float32])
+
+        # The tiled variant takes two more arguments: the local memory for the tile, and its size.
+
+        self._hbk_rect_propagator_tiled = self.cl_system.compiled_kernels._hbk_rect_propagator_tiled
+        self._hbk_rect_propagator_tiled.set_scalar_arg_dtypes([None,None,
+                                                        np.float32,np.float32,np.float32,
+                                                        np.float32,np.float32,np.float32,
+                                                        np.float32,np.float32,np.float32, 
+                                                        np.float32,np.float32,np.float32,
+                                                        np.int32,
+                                                        np.float32,np.float32, None, np.uint32])
+
+        # The blocked variants, by the count of points per work item. They take the same arguments as the kernel.
+
+        self._hbk_rect_propagator_blocked = {}
+
+        for points_per_work_item in handybeam.cl_system.blocked_kernel_points_per_work_item:
+            blocked_kernel = getattr(self.cl_system.compiled_kernels, '_hbk_rect_propagator_blocked{}'.format(points_per_work_item))
+            blocked_kernel.set_scalar_arg_dtypes([None,None,
+                                                  np.float32,np.float32,np.float32,
+                                                  np.float32,np.float32,np.float32,
+                                                  np.float32,np.float32,np.float32,
+                                                  np.float32,np.float32,np.float32,
+                                                  np.int32,
+                                                  np.float32,np.float32])
+            self._hbk_rect_propagator_blocked[points_per_work_item] = blocked_kernel
                                               
     def rect_propagator(self,
                         tx_array: handybeam.tx_array.TxArray,
@@ -45,8 +78,10 @@ class RectPropMixin():
                         x0, y0, z0,
                         vx1, vy1, vz1,
                         vx2, vy2, vz2,
-                        local_work_size = (1,1,1),
-                        print_performance_feedback = None
+                        local_work_size = None,
+                        print_performance_feedback = None,
+                        out = None,
+                        blocking = True
                         ):
 
         """This method simulates the acoustic pressure field on a rectilinear sampling grid. It does this by
@@ -83,10 +118,17 @@ class RectPropMixin():
                 The y-component of the second unit vector that parameterises the sampling grid.
         vz2 : numpy float
                 The z-component of the second unit vector that parameterises the sampling grid.       
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), the autotuned
+                work group shape for this device and problem size is used, see :code:`handybeam.cl_autotuner`.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
+        out : numpy array or None
+                If given, the :code:`(N_x, N_y, 5)` float32 array to write the result into, e.g. one from
+                :code:`empty_output_buffer`. Otherwise, a new array is returned.
+        blocking : boolean
+                If True (default), wait for the result and return it. Otherwise, return a
+                :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture` straight after enqueueing the work.
 
         """
 
@@ -103,23 +145,6 @@ class RectPropMixin():
 
         global_work_size = (N_x, N_y, 1)
 
-        # hardcoded: attempt to optimise the work size by finding the largest work group that will divide the work equally.
-        # find a highest divisor of the N_x that is smaller than max_local_worksize
-        max_local_worksize = 1024  # TODO: currently hard-coded, later on grab straight from the device.
-        current_local_worksize = max_local_worksize
-
-        while current_local_worksize > 0:
-            if N_x % current_local_worksize == 0:
-                # print(' divisor ', i)
-                break
-            current_local_worksize = current_local_worksize - 1
-
-        local_work_size = (current_local_worksize, 1, 1)
-
-        if print_performance_feedback:
-            print("global_work_size: {}".format(global_work_size))
-            print("local_work_size:  {}".format(local_work_size))
-
         # Determine the limits of the sampling grid.
 
         x_lim = np.float32(N_x/2)
@@ -133,27 +158,55 @@ class RectPropMixin():
         # the acoustic field. The format is:
         #  ( x,y,z,Real(p), Imag(p) )
                
-        py_out_buffer = np.zeros((N_x, N_y, 5), dtype=np.float32)
+        if out is None:
+            py_out_buffer = np.zeros((N_x, N_y, 5), dtype=np.float32)
+        else:
+            py_out_buffer = self.check_output_buffer(out, (N_x, N_y, 5))
 
-        # Create a buffer on the GPU to store the pressure values for the acoustic field.
+        # Get a buffer on the GPU to store the pressure values for the acoustic field from the pool.
 
-        cl_field = cl.Buffer(self.cl_system.context, cl.mem_flags.WRITE_ONLY, py_out_buffer.data.nbytes) 
+        buffer_pool = self.cl_system.buffer_pool
 
-        # Create a buffer on the GPU to store the transducer data
-        # and copy the data from the CPU (tx_array.tx_array_element_descriptor)
-        # to the GPU.
+        # Enqueue on the main queue when blocking. Otherwise use the next of the asynchronous queues,
+        # so that consecutive propagations can overlap.
 
-        # note! hostbuf must be a np.float32 --
-        # it is not checked here (for performance), just do it correctly the first time around!
-        cl_tx_element_array_descriptor = cl.Buffer(
-            self.cl_system.context,
-            cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,
-            hostbuf=tx_array.tx_array_element_descriptor)
-      
-        # Create and execute an OpenCL event with the initialised queue, work sizes and data.
+        queue = self.cl_system.queue if blocking else self.cl_system.next_async_queue()
 
-        cl_profiling_kernel_event = self._hbk_rect_propagator(  self.cl_system.queue,
-                                                                global_work_size,
+        cl_field = buffer_pool.acquire(py_out_buffer.data.nbytes, cl.mem_flags.WRITE_ONLY)
+
+        # Get the device-resident copy of the transducer data (tx_array.tx_array_element_descriptor).
+        # Only the rows that changed since the last call are uploaded to the GPU.
+
+        cl_tx_element_array_descriptor = self.cl_system.tx_array_buffer(tx_array)
+      
+        # Unless disabled, use the variant that stages the transducer data in local memory, one tile at a time.
+
+        if self.use_local_memory_tiles:
+            kernel = self._hbk_rect_propagator_tiled
+            tile_tx_count = self.cl_system.tx_tile_size(tx_array.element_count)
+            tile_arguments = (cl.LocalMemory(tile_tx_count * handybeam.cl_system.tx_descriptor_row_nbytes), np.uint32(tile_tx_count))
+        else:
+            kernel = self._hbk_rect_propagator
+            tile_arguments = ()
+
+        # Enqueue the kernel with the initialised queue, work sizes and data.
+        # With more than one point per work item, the blocked kernel computes that many neighbouring points along x.
+
+        def launch(points_per_work_item, local_work_size=None):
+
+            if points_per_work_item == 1:
+                variant_kernel = kernel
+                variant_global_work_size = global_work_size
+                extra_arguments = tile_arguments
+            else:
+                variant_kernel = self._hbk_rect_propagator_blocked[points_per_work_item]
+                variant_global_work_size = (-(-N_x // points_per_work_item), N_y, 1)
+                extra_arguments = ()
+
+            def launch_with(variant_global_work_size, local_work_size):
+
+                return variant_kernel(  queue,
+                                                                variant_global_work_size,
                                                                 local_work_size,
                                                                 cl_tx_element_array_descriptor,
                                                                 cl_field,
@@ -169,35 +222,85 @@ class RectPropMixin():
                                                                 np.float32(vx2),
                                                                 np.float32(vy2),
                                                                 np.float32(vz2),
-                                                                np.int(tx_count)
+                                                                np.int(tx_count),
+                                                                np.float32(self.parent.medium_wavelength),
+                                                                np.float32(self.parent.medium_wavenumber),
+                                                                *extra_arguments
                                                             )
 
-        # Copy the results from the GPU buffer to the associated CPU buffer. 
+            # Unless given, use the fastest work group shape for this device - it is timed on the first call.
+            # The blocked kernels skip the points past the edge of the grid, so their global work size can be padded.
+
+            if local_work_size is None:
+                variant_global_work_size, local_work_size = self.cl_system.autotuner.work_sizes(variant_kernel,
+                                                                                        variant_global_work_size,
+                                                                                        launch_with,
+                                                                                        pad_global_work_size=points_per_work_item > 1)
+            elif points_per_work_item > 1:
+                variant_global_work_size = handybeam.cl_autotuner.Autotuner.padded(variant_global_work_size, local_work_size)
+
+            if print_performance_feedback:
+                print("points_per_work_item: {}".format(points_per_work_item))
+                print("global_work_size: {}".format(variant_global_work_size))
+                print("local_work_size:  {}".format(local_work_size))
+
+            return launch_with(variant_global_work_size, local_work_size)
+
+        # Unless set, use the fastest count of points per work item for this device - it is timed on the first call.
+
+        points_per_work_item = self.points_per_work_item
+
+        if points_per_work_item is None:
+            if local_work_size is None:
+                points_per_work_item = self.cl_system.autotuner.select_variant(
+                                            '_hbk_rect_propagator_points_per_work_item',
+                                            global_work_size,
+                                            {points: functools.partial(launch, points) for points in [1] + sorted(self._hbk_rect_propagator_blocked)})
+            else:
+                points_per_work_item = 1
+
+        # Create and execute an OpenCL event.
+
+        cl_profiling_kernel_event = launch(points_per_work_item, local_work_size)
+
+        # Copy the results from the GPU buffer to the associated CPU buffer, without waiting for it.
+
+        cl_profiling_mem_copy_event = cl.enqueue_copy(queue, py_out_buffer, cl_field, is_blocking=False)
+
+        # The next update of the transducer data on the GPU has to wait for this kernel.
+
+        self.cl_system.add_tx_array_buffer_reader(tx_array, cl_profiling_kernel_event)
+
+        def on_completion(py_out_buffer):
 
-        cl_profiling_mem_copy_event = cl.enqueue_copy(self.cl_system.queue, py_out_buffer, cl_field)
+            # Nothing uses the GPU buffer any more - return it to the pool.
 
-        # Block until the kernel event has completed and then until the copy event has completed. 
+            buffer_pool.release(cl_field)
 
-        cl_profiling_kernel_event.wait() 
+            # End the timer to measure the wall time.
 
-        cl_profiling_mem_copy_event.wait()
+            t_elapsed_wall_time = timer() - t_start
 
-        # End the timer to measure the wall time.
+            # If performance feedback requested then print.
 
-        t_end = timer()
+            if print_performance_feedback:
+                ray_count = float(tx_array.element_count * N_x * N_y)
+                output_buffer_size = py_out_buffer.data.nbytes
+                self.print_performance_feedback(cl_profiling_kernel_event,
+                                                cl_profiling_mem_copy_event,
+                                                t_elapsed_wall_time,
+                                                ray_count,
+                                                output_buffer_size)
 
-        t_elapsed_wall_time = t_end - t_start
+        future = handybeam.opencl_wrappers.propagation_future.PropagationFuture(
+                                    events=[cl_profiling_kernel_event, cl_profiling_mem_copy_event],
+                                    result=py_out_buffer)
+        future.add_done_callback(on_completion)
 
-        # If performance feedback requested then print. 
+        # Block until the kernel event has completed and then until the copy event has completed.
 
-        if print_performance_feedback:
-            ray_count = float(tx_array.element_count * N_x * N_y)
-            output_buffer_size = py_out_buffer.data.nbytes
-            self.print_performance_feedback(cl_profiling_kernel_event,
-                                            cl_profiling_mem_copy_event,
-                                            t_elapsed_wall_time,
-                                            ray_count,
-                                            output_buffer_size)
+        if blocking:
+            return future.result()
 
-        return py_out_buffer
+        return future
 
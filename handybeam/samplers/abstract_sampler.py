@@ -27,6 +27,11 @@ class AbstractSampler(RememberInstanceCreationInfo):
         self.coordinates = None
         self.area = None
         self.volume = None
+        self.output_buffers = [None, None]
+        self.output_buffer_index = 0
+        self.pending_propagations = [None, None]
+        self.propagation_count = 0
+        self.stored_propagation_count = 0
   
     def set_parent(self, parent):
         """Sets the parent of this instance if one has not been provided.
@@ -41,6 +46,74 @@ class AbstractSampler(RememberInstanceCreationInfo):
 
         self.parent = parent
 
+    def get_output_buffer(self, shape):
+        """Returns the array for the propagator to write into.
+
+        Two arrays are used in turn, so that one propagation can be in flight while the result of the previous
+        one is read. Each is reused for as long as the shape does not change. The arrays are obtained from
+        :code:`parent.propagator.empty_output_buffer`, so with the OpenCL propagator they are page-locked.
+
+        Parameters
+        ----------
+
+        shape : tuple
+                shape of the propagator output.
+
+        """
+
+        self.output_buffer_index = 1 - self.output_buffer_index
+
+        # The propagation before the previous one might still be writing into this array.
+
+        pending_propagation = self.pending_propagations[self.output_buffer_index]
+
+        if pending_propagation is not None:
+            pending_propagation.result()
+            self.pending_propagations[self.output_buffer_index] = None
+
+        output_buffer = self.output_buffers[self.output_buffer_index]
+
+        if output_buffer is None or output_buffer.shape != tuple(shape):
+            output_buffer = self.parent.propagator.empty_output_buffer(shape)
+            self.output_buffers[self.output_buffer_index] = output_buffer
+
+        return output_buffer
+
+    def track_propagation(self, future, store_kernel_output):
+        """Makes the sampler store the result of an asynchronous propagation, once it is collected.
+
+        The propagation must write into the array last returned by :code:`get_output_buffer`.
+        The result of an older propagation that is collected late does not overwrite the result of a newer one.
+
+        Parameters
+        ----------
+
+        future : handybeam.opencl_wrappers.propagation_future.PropagationFuture
+                the handle returned by the propagator.
+        store_kernel_output : function
+                called with the propagator output, to update e.g. the :code:`pressure_field`.
+
+        Returns
+        -------
+
+        handybeam.opencl_wrappers.propagation_future.PropagationFuture
+                :code:`future`, for convenience.
+
+        """
+
+        self.propagation_count = self.propagation_count + 1
+        propagation_count = self.propagation_count
+
+        def store_if_newer(kernel_output):
+            if propagation_count > self.stored_propagation_count:
+                self.stored_propagation_count = propagation_count
+                store_kernel_output(kernel_output)
+
+        future.add_done_callback(store_if_newer)
+        self.pending_propagations[self.output_buffer_index] = future
+
+        return future
+
     @copy_docstring(handybeam.visualise.visualise_all_in_one, prepend=True)
     def visualise_all_in_one(self, filename=None):
 
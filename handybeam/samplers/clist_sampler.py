@@ -11,7 +11,7 @@ class ClistSampler(AbstractSampler):
 
     '''
 
-    def __init__(self, parent=None, local_work_size=(128, 1, 1)):
+    def __init__(self, parent=None, local_work_size=None):
 
         '''This method intialises an instance of the ClistSampler class.
 
@@ -20,9 +20,9 @@ class ClistSampler(AbstractSampler):
 
         parent : handybeam_core.world.World
                 This is an instance of the handybeam world class. 
-        local_work_size : tuple
+        local_work_size : tuple or None
                 This sets the local work size for the GPU, not recommended to change unless the user
-                has experience with OpenCL and pyopencl.
+                has experience with OpenCL and pyopencl. If None (default), it is autotuned for the device.
 
         '''
         
@@ -141,12 +141,51 @@ class ClistSampler(AbstractSampler):
 
         """
 
-        kernel_output = self.parent.propagator.clist_propagator(
+        self.propagate_async(print_performance_feedback=print_performance_feedback).result()
+
+    def propagate_async(self, print_performance_feedback=False):
+
+        """This method starts the clist_propagator, and returns without waiting for it to complete.
+
+        The :code:`pressure_field` is updated when the result of the returned future is collected.
+
+        Parameters
+        ----------
+
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the GPU performance.
+
+        Returns
+        -------
+
+        handybeam.opencl_wrappers.propagation_future.PropagationFuture
+                handle to the propagation.
+
+        """
+
+        future = self.parent.propagator.clist_propagator(
                                                         tx_array=self.parent.tx_array,
                                                         sampling_point_list=self.coordinates,
                                                         local_work_size= self.local_work_size,
-                                                        print_performance_feedback=print_performance_feedback
+                                                        print_performance_feedback=print_performance_feedback,
+                                                        out=self.get_output_buffer((self.coordinates.shape[0], 2)),
+                                                        blocking=False
                                                     )
+
+        return self.track_propagation(future, self.store_kernel_output)
+
+    def store_kernel_output(self, kernel_output):
+
+        """This method updates the sampler from the output of the clist_propagator.
+
+        Parameters
+        ----------
+
+        kernel_output : numpy array
+                the array returned by the clist_propagator.
+
+        """
+
         self.pressure_field = np.nan_to_num(kernel_output[:, 0] + np.complex(0, 1) * kernel_output[:, 1])
 
     @property
@@ -166,4 +205,4 @@ class ClistSampler(AbstractSampler):
         :return: a formatted string representing some fun fucts about this instance . . .
         """
         bbox = self.bounding_box
-        return f"Coordinate list sampler, {self.no_points } points; bounding box: {bbox[0]*1e3:0.1f} x {bbox[1]*1e3:0.1f} x {bbox[2]*1e3:0.1f} mm"
\ No newline at end of file
+        return f"Coordinate list sampler, {self.no_points } points; bounding box: {bbox[0]*1e3:0.1f} x {bbox[1]*1e3:0.1f} x {bbox[2]*1e3:0.1f} mm"
@@ -28,7 +28,7 @@ class HexagonalSampler(AbstractSampler):
                 grid_spacing_per_wavelength = 0.2,
                 grid_spacing_per_m = None,
                 grid_extent_around_origin = 0.2,
-                local_work_size = (1,1,1)):
+                local_work_size = None):
 
         '''This method intialises an instance of the HexagonalSampler class.
 
@@ -49,9 +49,9 @@ class HexagonalSampler(AbstractSampler):
                 This specifies the grid spacing in meters.
         grid_extent_around_origin : float
                 This specifies the distance between the origin of the sampling grid and the edge.
-        local_work_size : tuple
+        local_work_size : tuple or None
                 This sets the local work size for the GPU, not recommended to change unless the user
-                has experience with OpenCL and pyopencl.
+                has experience with OpenCL and pyopencl. If None (default), it is autotuned for the device.
         '''
 
         super(HexagonalSampler,self).__init__()
@@ -176,7 +176,29 @@ class HexagonalSampler(AbstractSampler):
 
         '''
 
-        kernel_output = self.parent.propagator.hex_propagator(    
+        self.propagate_async(print_performance_feedback = print_performance_feedback).result()
+
+    def propagate_async(self,print_performance_feedback = False):
+
+        '''This method starts the hex_propagator, and returns without waiting for it to complete.
+
+        The :code:`pressure_field` and :code:`coordinates` are updated when the result of the returned future is collected.
+
+        Parameters
+        ----------
+
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the GPU performance.
+
+        Returns
+        -------
+
+        handybeam.opencl_wrappers.propagation_future.PropagationFuture
+                handle to the propagation.
+
+        '''
+
+        future = self.parent.propagator.hex_propagator(    
                                                             self.parent.tx_array,
                                                             self.side_length,
                                                             self.delta,
@@ -184,10 +206,24 @@ class HexagonalSampler(AbstractSampler):
                                                             self.vx1,self.vy1,self.vz1,
                                                             self.vx2,self.vy2,self.vz2,
                                                             local_work_size = self.local_work_size,
-                                                            print_performance_feedback = print_performance_feedback
+                                                            print_performance_feedback = print_performance_feedback,
+                                                            out = self.get_output_buffer((self.grid_length, self.grid_length, 5)),
+                                                            blocking = False
                                                         )
-                                                        
+
+        return self.track_propagation(future, self.store_kernel_output)
+
+    def store_kernel_output(self, kernel_output):
+
+        '''This method updates the sampler from the output of the hex_propagator.
+
+        Parameters
+        ----------
+
+        kernel_output : numpy array
+                the array returned by the hex_propagator.
+
+        '''
 
         self.pressure_field= kernel_output[:,:,3] + np.complex(0,1) * kernel_output[:,:,4]
         self.coordinates = kernel_output[:,:,0:4]
- 
\ No newline at end of file
@@ -37,7 +37,7 @@ class LambertSampler(AbstractSampler):
                 origin = np.array((0,0,0)),
                 required_resolution = 12e-3, 
                 radius = 50e-3,
-                local_work_size = (1,1,1)):
+                local_work_size = None):
 
 
         '''This method intialises an instance of the LambertSampler class.
@@ -54,9 +54,9 @@ class LambertSampler(AbstractSampler):
                 the number of sampling points.
         radius : float
                 This specifies radius of the hemispherical sampling grid. 
-        local_work_size : tuple
+        local_work_size : tuple or None
                 This sets the local work size for the GPU, not recommended to change unless the user
-                has experience with OpenCL and pyopencl.
+                has experience with OpenCL and pyopencl. If None (default), it is autotuned for the device.
         '''
 
         super(LambertSampler,self).__init__()
@@ -94,16 +94,53 @@ class LambertSampler(AbstractSampler):
 
         '''
 
-        kernel_output = self.parent.propagator.lamb_propagator(
+        self.propagate_async(print_performance_feedback = print_performance_feedback).result()
+
+    def propagate_async(self,print_performance_feedback = False):
+
+        '''This method starts the lamb_propagator, and returns without waiting for it to complete.
+
+        The :code:`pressure_field` and :code:`coordinates` are updated when the result of the returned future is collected.
+
+        Parameters
+        ----------
+
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the GPU performance.
+
+        Returns
+        -------
+
+        handybeam.opencl_wrappers.propagation_future.PropagationFuture
+                handle to the propagation.
+
+        '''
+
+        future = self.parent.propagator.lamb_propagator(
                                                             self.parent.tx_array,
                                                             self.radius,
                                                             self.N,
                                                             self.density,
                                                             self.x0,self.y0,self.z0,
                                                             local_work_size = self.local_work_size,
-                                                            print_performance_feedback = print_performance_feedback
+                                                            print_performance_feedback = print_performance_feedback,
+                                                            out = self.get_output_buffer((self.N, self.N, 5)),
+                                                            blocking = False
                                                         )
-                                                        
+
+        return self.track_propagation(future, self.store_kernel_output)
+
+    def store_kernel_output(self, kernel_output):
+
+        '''This method updates the sampler from the output of the lamb_propagator.
+
+        Parameters
+        ----------
+
+        kernel_output : numpy array
+                the array returned by the lamb_propagator.
+
+        '''
+
         self.pressure_field= kernel_output[:,:,3] + np.complex(0,1) * kernel_output[:,:,4]
         self.coordinates = kernel_output[:,:,0:4]
- 
\ No newline at end of file
@@ -42,7 +42,7 @@ class RectilinearSampler(AbstractSampler):
                  grid_spacing_per_m=None,
                  grid_extent_around_origin_x=200e-3,
                  grid_extent_around_origin_y=200e-3,
-                 local_work_size=(1, 1, 1),
+                 local_work_size=None,
                  align_grid_size_to_gpu=64
                  ):
 
@@ -69,9 +69,9 @@ class RectilinearSampler(AbstractSampler):
         grid_extent_around_origin_y : float
                   This specifies the distance between the origin of the sampling grid and the edge along the
                   y-axis.
-        local_work_size : tuple
+        local_work_size : tuple or None
                   This sets the local work size for the GPU, not recommended to change unless the user
-                  has experience with OpenCL and pyopencl.
+                  has experience with OpenCL and pyopencl. If None (default), it is autotuned for the device.
         align_grid_size_to_gpu : int
                   if set to true, the precise sampling density will be adjusted so that the count of pixels is a multiply of 256. This increases overall throughput of the GPU
         """
@@ -205,15 +205,41 @@ class RectilinearSampler(AbstractSampler):
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
         local_work_size : tuple or None
-                Tuple e.g. (1,1,1) - set to use that work unit size.
-                Note that correct setting require in-depth understanding of the GPU properties. Do not change away from (1,1,1) unless you know what You are doing.
+                Tuple e.g. (64,1,1) - set to use that work unit size. If None, the sampler's setting is used,
+                which by default is autotuned for the device. Note that correct setting require in-depth understanding of the GPU properties.
+
+        """
+
+        self.propagate_async(print_performance_feedback=print_performance_feedback,
+                             local_work_size=local_work_size).result()
+
+    def propagate_async(self,
+                        print_performance_feedback=False,
+                        local_work_size=None):
+        """Starts the rect_propagator, and returns without waiting for it to complete.
+
+        The :code:`pressure_field` and :code:`coordinates` are updated when the result of the returned future is collected.
+
+        Parameters
+        ----------
+
+        print_performance_feedback : boolean
+                Boolean value determining whether or not to output the GPU performance.
+        local_work_size : tuple or None
+                Tuple e.g. (64,1,1) - set to use that work unit size. See :meth:`propagate`.
+
+        Returns
+        -------
+
+        handybeam.opencl_wrappers.propagation_future.PropagationFuture
+                handle to the propagation.
 
         """
 
         if local_work_size is None:
             local_work_size = self.local_work_size
 
-        kernel_output = self.parent.propagator.rect_propagator(    
+        future = self.parent.propagator.rect_propagator(    
                                                             self.parent.tx_array,
                                                             self.N_x,
                                                             self.N_y,
@@ -222,9 +248,24 @@ class RectilinearSampler(AbstractSampler):
                                                             self.vx1, self.vy1, self.vz1,
                                                             self.vx2, self.vy2, self.vz2,
                                                             local_work_size=local_work_size,
-                                                            print_performance_feedback=print_performance_feedback
+                                                            print_performance_feedback=print_performance_feedback,
+                                                            out=self.get_output_buffer((self.N_x, self.N_y, 5)),
+                                                            blocking=False
                                                         )
-                         
+
+        return self.track_propagation(future, self.store_kernel_output)
+
+    def store_kernel_output(self, kernel_output):
+        """Updates the sampler from the output of the rect_propagator.
+
+        Parameters
+        ----------
+
+        kernel_output : numpy array
+                the array returned by the rect_propagator.
+
+        """
+
         self.coordinates = kernel_output[:, :, 0:3]
         self.pressure_field = kernel_output[:, :, 3] + np.complex(0, 1)*kernel_output[:, :, 4]
 
@@ -37,7 +37,7 @@ class Solver:
         self.parent = parent
         self.solver = solver_wrappers.Solver(parent=self.parent)
     
-    def single_focus_solver(self, x_focus, y_focus, z_focus, local_work_size=(1, 1, 1), print_performance_feedback=False):
+    def single_focus_solver(self, x_focus, y_focus, z_focus, local_work_size=None, print_performance_feedback=False):
         """ Solve excitation coefficients for a single focal point
         
         This method calls the OpenCL wrapper mixin class single_focus_solver which determines
@@ -52,8 +52,8 @@ class Solver:
                 This is the y-coordinate of the requested focal point position.
         z_focus : numpy float
                 This is the z-coordinate of the requested focal point position.          
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), it is autotuned for the device.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance statistics.
         
@@ -32,7 +32,7 @@ class SFSolverMixin():
 
         self._hbk_sf_solver = self.cl_system.compiled_kernels._hbk_sf_solver
 
-        self._hbk_sf_solver.set_scalar_arg_dtypes([None,None,np.float32,np.float32,np.float32])
+        self._hbk_sf_solver.set_scalar_arg_dtypes([None,None,np.float32,np.float32,np.float32,np.float32])
 
     def single_focus_solver(
                             self, 
@@ -56,8 +56,9 @@ class SFSolverMixin():
                 This is the y-coordinate of the requested focal point position.
         zf : numpy float
                 This is the z-coordinate of the requested focal point position.              
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), the autotuned
+                work group shape for this device and problem size is used, see :code:`handybeam.cl_autotuner`.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
 
@@ -71,11 +72,9 @@ class SFSolverMixin():
 
         no_transducers = tx_array.element_count
 
-        # Set global and local work sizes.
+        # Set the global work size - one work item per transducer.
 
-        thread_group_count=min(no_transducers, 32) 
         global_work_size = (no_transducers, 1, 1)
-        local_work_size = (thread_group_count, 1, 1)
      
         # Create a numpy array, of the correct type, to store the transducer information.
 
@@ -85,24 +84,37 @@ class SFSolverMixin():
 
         cl_out_buffer = cl.Buffer(self.cl_system.context, cl.mem_flags.WRITE_ONLY, py_out_buffer.data.nbytes) 
 
-        # Create a buffer on the GPU to store the transducer data
-        # and copy the data from the CPU (tx_array.tx_array_element_descriptor)
-        # to the GPU.
+        # Get the device-resident copy of the transducer data (tx_array.tx_array_element_descriptor).
+        # Only the rows that changed since the last call are uploaded to the GPU.
 
-        cl_tx_element_array_descriptor = cl.Buffer(self.cl_system.context, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,hostbuf=tx_array.tx_array_element_descriptor)
+        cl_tx_element_array_descriptor = self.cl_system.tx_array_buffer(tx_array)
 
-        # Create and execute an OpenCL event with the initialised queue, work sizes and data.
+        # Enqueue the kernel with the initialised queue, work sizes and data.
 
-        cl_profiling_kernel_event = self._hbk_sf_solver(  self.cl_system.queue,
+        def launch(global_work_size, local_work_size):
+
+            return self._hbk_sf_solver(  self.cl_system.queue,
                                                                 global_work_size,
                                                                 local_work_size,
                                                                 cl_tx_element_array_descriptor,
                                                                 cl_out_buffer,
                                                                 np.float32(xf),
                                                                 np.float32(yf),
-                                                                np.float32(zf)
+                                                                np.float32(zf),
+                                                                np.float32(self.parent.medium_wavenumber)
                                                                 )
 
+        # Unless given, use the fastest work group shape for this device - it is timed on the first call.
+
+        if local_work_size is None:
+            global_work_size, local_work_size = self.cl_system.autotuner.work_sizes(self._hbk_sf_solver,
+                                                                                    global_work_size,
+                                                                                    launch)
+
+        # Create and execute an OpenCL event.
+
+        cl_profiling_kernel_event = launch(global_work_size, local_work_size)
+
         # Copy the results from the GPU buffer to the associated CPU buffer. 
 
         cl_profiling_mem_copy_event = cl.enqueue_copy(self.cl_system.queue,py_out_buffer, cl_out_buffer)
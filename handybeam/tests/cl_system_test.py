@@ -50,8 +50,150 @@ class ClSystemTests(unittest.TestCase):
 
         self.assertEqual(fail,False)
 
+    def test_binary_cache(self):
 
-## Script 
+        import tempfile
+        import handybeam.cl_system
+
+        original_cache_folder = handybeam.cl_system.cl_binary_cache_folder
+
+        try:
+            with tempfile.TemporaryDirectory() as cache_folder:
+
+                handybeam.cl_system.cl_binary_cache_folder = cache_folder
+
+                self.cl_system = handybeam.cl_system.OpenCLSystem()
+                cached_files = os.listdir(cache_folder)
+
+                # A second instance builds from the stored binary, and gets the same kernels.
+
+                second_cl_system = handybeam.cl_system.OpenCLSystem()
+
+                self.assertEqual(len(cached_files), 1)
+                self.assertEqual(cached_files, os.listdir(cache_folder))
+                self.assertEqual(sorted(k.function_name for k in self.cl_system.compiled_kernels.all_kernels()),
+                                 sorted(k.function_name for k in second_cl_system.compiled_kernels.all_kernels()))
+        finally:
+            handybeam.cl_system.cl_binary_cache_folder = original_cache_folder
+
+    def test_shared_cl_system(self):
+
+        import handybeam.world
+        import handybeam.solver
+        import handybeam.translator
+
+        world = handybeam.world.World()
+        solver = handybeam.solver.Solver(parent=world)
+        translator = handybeam.translator.Translator(parent=world)
+
+        # The propagator, solver and translator of a world all use the same context and program.
+
+        self.cl_system = world.propagator.cl_system
+
+        fail = False
+
+        if  solver.solver.cl_system is not self.cl_system or \
+            translator.translator.cl_system is not self.cl_system:
+
+            fail = True
+
+        self.assertEqual(fail,False)
+
+    def test_tx_array_buffer(self):
+
+        import numpy as np
+        import pyopencl as cl
+        import handybeam.cl_system
+        import handybeam.tx_array_library
+
+        self.cl_system = handybeam.cl_system.OpenCLSystem()
+        tx_array = handybeam.tx_array_library.rectilinear()
+
+        buffer = self.cl_system.tx_array_buffer(tx_array)
+
+        # Change two rows in place, and assign a new descriptor - the same device buffer is updated each time.
+
+        tx_array.tx_array_element_descriptor[3, 11] = 1.0
+        tx_array.tx_array_element_descriptor[7, 10] = 0.5
+
+        self.assertIs(self.cl_system.tx_array_buffer(tx_array), buffer)
+
+        generation = tx_array.generation
+        tx_array.tx_array_element_descriptor = tx_array.tx_array_element_descriptor * np.float32(2.0)
+
+        self.assertEqual(tx_array.generation, generation + 1)
+        self.assertIs(self.cl_system.tx_array_buffer(tx_array), buffer)
+
+        on_device = np.empty_like(tx_array.tx_array_element_descriptor)
+        cl.enqueue_copy(self.cl_system.queue, on_device, buffer)
+
+        self.assertTrue(np.array_equal(on_device.view(np.uint32), tx_array.tx_array_element_descriptor.view(np.uint32)))
+
+    def test_buffer_pool(self):
+
+        import numpy as np
+        import pyopencl as cl
+        import handybeam.cl_system
+
+        self.cl_system = handybeam.cl_system.OpenCLSystem()
+        pool = self.cl_system.buffer_pool
+
+        # A released buffer is handed out again for the same size and flags - but not for others.
+
+        buffer = pool.acquire(4096, cl.mem_flags.WRITE_ONLY)
+        pool.release(buffer)
+
+        self.assertIsNot(pool.acquire(4096, cl.mem_flags.READ_ONLY), buffer)
+        self.assertIs(pool.acquire(4096, cl.mem_flags.WRITE_ONLY), buffer)
+
+        pinned_array = pool.acquire_pinned_array((32, 2))
+        pool.release_pinned_array(pinned_array)
+
+        self.assertEqual(pinned_array.dtype, np.float32)
+        self.assertIs(pool.acquire_pinned_array((32, 2), np.float32), pinned_array)
+
+    def test_autotuner(self):
+
+        import json
+        import tempfile
+        import numpy as np
+        import handybeam.cl_autotuner
+        import handybeam.world
+        import handybeam.tx_array_library
+
+        original_cache_file_name = handybeam.cl_autotuner.cl_autotune_cache_file_name
+
+        try:
+            with tempfile.TemporaryDirectory() as cache_folder:
+
+                handybeam.cl_autotuner.cl_autotune_cache_file_name = os.path.join(cache_folder, 'cl_autotune_cache.json')
+                handybeam.cl_autotuner.clear_cache()
+
+                world = handybeam.world.World()
+                world.tx_array = handybeam.tx_array_library.rectilinear(parent=world)
+                self.cl_system = world.propagator.cl_system
+
+                # An odd point count - the autotuned work group has to be padded over.
+
+                points = np.random.RandomState(0).uniform(-0.1, 0.1, (1001, 3)).astype(np.float32)
+                points[:, 2] = points[:, 2] + 0.2
+
+                tuned_result = world.propagator.clist_propagator(world.tx_array, points)
+                fixed_result = world.propagator.clist_propagator(world.tx_array, points, local_work_size=(1, 1, 1))
+
+                with open(handybeam.cl_autotuner.cl_autotune_cache_file_name, 'r') as f:
+                    stored = json.load(f)[self.cl_system.autotuner.device_key]['_hbk_clist_propagator']['1024']
+
+                max_work_group_size = self.cl_system.autotuner.max_work_group_size(world.propagator._hbk_clist_propagator)
+
+                self.assertLessEqual(int(np.prod(stored)), max_work_group_size)
+                self.assertTrue(np.allclose(tuned_result, fixed_result, equal_nan=True))
+        finally:
+            handybeam.cl_autotuner.cl_autotune_cache_file_name = original_cache_file_name
+            handybeam.cl_autotuner.clear_cache()
+
+
+## Script
 
 if __name__ == '__main__':
 
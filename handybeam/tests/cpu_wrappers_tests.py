@@ -0,0 +1,122 @@
+## Imports
+
+import os
+import sys
+import inspect
+import unittest
+
+# Include path to handybeam directory
+
+sys.path.append('../.')
+
+## Class
+
+class CpuWrappersTests(unittest.TestCase):
+
+    def setUp(self):
+
+        self.world = None
+
+    def tearDown(self):
+
+        del self.world
+
+    def test_import(self):
+
+        module_name_1 = 'handybeam.cpu_wrappers'
+        module_name_2 = 'handybeam.cpu_wrappers.grid_coordinates'
+        module_name_3 = 'handybeam.cpu_wrappers.numpy_propagator'
+
+        import handybeam.cpu_wrappers
+        import handybeam.cpu_wrappers.grid_coordinates
+        import handybeam.cpu_wrappers.numpy_propagator
+
+        fail = False
+
+        if  module_name_1 not in sys.modules or \
+            module_name_2 not in sys.modules or \
+            module_name_3 not in sys.modules:
+
+            fail = True
+
+        self.assertEqual(fail,False)
+
+    def test_instance_creation(self):
+
+        import handybeam.world
+        import handybeam.cpu_wrappers.numpy_propagator
+
+        self.world = handybeam.world.World(backend='numpy')
+
+        fail = True
+
+        if isinstance(self.world.propagator, handybeam.cpu_wrappers.numpy_propagator.NumpyPropagator):
+
+            fail = False
+
+        self.assertEqual(fail,False)
+
+    def test_single_element_on_axis(self):
+
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+
+        self.world = handybeam.world.World(backend='numpy')
+        self.world.tx_array = handybeam.tx_array_library.single_element(parent=self.world)
+
+        # On the axis, the directivity polynomial reduces to its c0 coefficient.
+
+        distance = 0.1
+        tx = self.world.tx_array.tx_array_element_descriptor[0]
+        expected_amplitude = tx[7] * self.world.medium_wavelength / distance
+        expected_phase = np.fmod(2 * np.pi * self.world.medium_wavenumber * distance, 2 * np.pi)
+
+        points = np.array([[0.0, 0.0, distance], [0.0, 0.0, -distance], [0.0, 0.0, 1e-3]], dtype=np.float32)
+        result = self.world.propagator.clist_propagator(self.world.tx_array, points)
+
+        self.assertAlmostEqual(result[0, 0] / expected_amplitude, np.cos(expected_phase), places=4)
+        self.assertAlmostEqual(result[0, 1] / expected_amplitude, np.sin(expected_phase), places=4)
+
+        # Behind the transducer and inside of it there is no output.
+
+        self.assertTrue(np.all(np.isnan(result[1:])))
+
+    def test_numba_matches_numpy(self):
+
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+        import handybeam.cpu_wrappers.numba_propagator
+
+        if handybeam.cpu_wrappers.numba_propagator.numba is None:
+            self.skipTest('numba is not installed')
+
+        self.world = handybeam.world.World(backend='numba')
+        self.world.tx_array = handybeam.tx_array_library.rectilinear(parent=self.world)
+
+        points = np.random.RandomState(0).uniform(-0.1, 0.1, (256, 3)).astype(np.float32)
+        points[:, 2] = points[:, 2] + 0.1
+
+        numba_result = self.world.propagator.clist_propagator(self.world.tx_array, points)
+        numpy_result = handybeam.cpu_wrappers.numpy_propagator.NumpyPropagator.propagate_point_list(
+            self.world.propagator, self.world.tx_array, points)
+
+        valid = np.isfinite(numpy_result)
+
+        self.assertTrue(np.array_equal(valid, np.isfinite(numba_result)))
+        self.assertLess(np.max(np.abs(numba_result[valid] - numpy_result[valid])), 1e-4 * np.max(np.abs(numpy_result[valid])))
+
+    def test_unknown_backend(self):
+
+        import handybeam.world
+
+        with self.assertRaises(RuntimeError):
+            self.world = handybeam.world.World(backend='no such backend')
+
+
+## Script
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -70,6 +70,123 @@ class OpenclWrappersTests(unittest.TestCase):
 
         self.assertEqual(fail,False)
 
+    def test_frequency_sweep(self):
+
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+        import handybeam.cpu_wrappers.numpy_propagator
+
+        world = handybeam.world.World()
+        world.tx_array = handybeam.tx_array_library.rectilinear(parent=world)
+        self.propagator_wrapper = world.propagator
+        cl_system = world.propagator.cl_system
+
+        points = np.random.RandomState(0).uniform(-0.1, 0.1, (1024, 3)).astype(np.float32)
+        points[:, 2] = points[:, 2] + 0.15
+
+        # Changing the frequency takes effect at the next call, without building a new program.
+
+        for frequency in [35000, 40000, 45000]:
+
+            world.frequency = frequency
+
+            opencl_result = world.propagator.clist_propagator(world.tx_array, points)
+            numpy_result = handybeam.cpu_wrappers.numpy_propagator.numpy_point_list_propagator(
+                world.tx_array.tx_array_element_descriptor, points, world.medium_wavelength, world.medium_wavenumber)
+
+            self.assertLess(np.max(np.abs(opencl_result - numpy_result)), 1e-3 * np.max(np.abs(numpy_result)))
+
+        self.assertIs(world.propagator.cl_system, cl_system)
+
+    def test_output_buffer_reuse(self):
+
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+
+        world = handybeam.world.World()
+        world.tx_array = handybeam.tx_array_library.rectilinear(parent=world)
+        self.propagator_wrapper = world.propagator
+
+        # Fewer points than one work group.
+
+        points = np.array([[0.0, 0.0, 0.1], [0.01, 0.0, 0.1], [0.0, 0.01, 0.1]], dtype=np.float32)
+
+        expected = world.propagator.clist_propagator(world.tx_array, points)
+
+        out = world.propagator.empty_output_buffer((3, 2))
+
+        for repeat in range(3):
+            result = world.propagator.clist_propagator(world.tx_array, points, out=out)
+            self.assertIs(result, out)
+            self.assertTrue(np.array_equal(result, expected))
+
+        with self.assertRaises(RuntimeError):
+            world.propagator.clist_propagator(world.tx_array, points, out=np.zeros((4, 2), dtype=np.float32))
+
+    def test_local_memory_tiles(self):
+
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+
+        world = handybeam.world.World()
+        world.tx_array = handybeam.tx_array_library.rectilinear(parent=world)
+        self.propagator_wrapper = world.propagator
+        cl_system = world.propagator.cl_system
+
+        # An odd point count, points behind the array, and several tiles with a partial last one.
+
+        points = np.random.RandomState(0).uniform(-0.1, 0.1, (1001, 3)).astype(np.float32)
+        points[:, 2] = points[:, 2] + 0.05
+
+        grid = (64, 32, 1e-3, 0.0, 0.0, 0.1, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+        results = []
+
+        try:
+            cl_system.tx_tile_size = lambda tx_count: 7
+
+            for use_local_memory_tiles in (False, True):
+                world.propagator.use_local_memory_tiles = use_local_memory_tiles
+                results.append((world.propagator.clist_propagator(world.tx_array, points, local_work_size=(16, 1, 1)),
+                                world.propagator.rect_propagator(world.tx_array, *grid)))
+        finally:
+            del cl_system.tx_tile_size
+
+        for untiled, tiled in zip(*results):
+            self.assertTrue(np.array_equal(np.isnan(untiled), np.isnan(tiled)))
+            self.assertTrue(np.allclose(untiled, tiled, rtol=1e-4, atol=1e-4 * np.nanmax(np.abs(untiled)), equal_nan=True))
+
+    def test_blocked_kernels(self):
+
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+
+        world = handybeam.world.World()
+        world.tx_array = handybeam.tx_array_library.rectilinear(parent=world)
+        self.propagator_wrapper = world.propagator
+
+        # Counts of points and of grid columns that are not multiples of the block sizes.
+
+        points = np.random.RandomState(0).uniform(-0.1, 0.1, (1001, 3)).astype(np.float32)
+        points[:, 2] = points[:, 2] + 0.05
+
+        grid = (61, 32, 1e-3, 0.0, 0.0, 0.1, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+        results = {}
+
+        for points_per_work_item in (1, 2, 4, 8):
+            world.propagator.points_per_work_item = points_per_work_item
+            results[points_per_work_item] = (world.propagator.clist_propagator(world.tx_array, points),
+                                             world.propagator.rect_propagator(world.tx_array, *grid))
+
+        for points_per_work_item in (2, 4, 8):
+            for expected, result in zip(results[1], results[points_per_work_item]):
+                self.assertTrue(np.array_equal(np.isnan(expected), np.isnan(result)))
+                self.assertTrue(np.allclose(expected, result, rtol=1e-4, atol=1e-4 * np.nanmax(np.abs(expected)), equal_nan=True))
 
 
 ## Script 
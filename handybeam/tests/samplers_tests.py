@@ -93,7 +93,42 @@ class SamplersTests(unittest.TestCase):
 
         self.assertEqual(fail,False)
 
+    def test_propagate_async(self):
 
+        import numpy as np
+        import handybeam.world
+        import handybeam.tx_array_library
+        import handybeam.samplers.rectilinear_sampler
+
+        world = handybeam.world.World()
+        world.tx_array = handybeam.tx_array_library.rectilinear(parent = world)
+        self.rectilinear_sampler = world.add_sampler(handybeam.samplers.rectilinear_sampler.RectilinearSampler(parent = world))
+
+        # The reference results of two frames, with different phases.
+
+        phases = [np.zeros(world.tx_array.element_count), np.linspace(0, np.pi, world.tx_array.element_count)]
+        expected = []
+
+        for frame_phases in phases:
+            world.tx_array.tx_array_element_descriptor[:, 11] = frame_phases
+            world.propagate()
+            expected.append(self.rectilinear_sampler.pressure_field.copy())
+
+        # Enqueue both frames before collecting either - and collect them out of order.
+
+        world.tx_array.tx_array_element_descriptor[:, 11] = phases[0]
+        first_frame = self.rectilinear_sampler.propagate_async()
+        world.tx_array.tx_array_element_descriptor[:, 11] = phases[1]
+        second_frame = world.propagate_async()
+
+        self.assertEqual(second_frame.result(), [self.rectilinear_sampler])
+        self.assertTrue(np.array_equal(self.rectilinear_sampler.pressure_field, expected[1]))
+
+        first_frame_output = first_frame.result()
+
+        self.assertTrue(first_frame.done())
+        self.assertTrue(np.array_equal(first_frame_output[:, :, 3], expected[0].real))
+        self.assertTrue(np.array_equal(self.rectilinear_sampler.pressure_field, expected[1]))
 
 
 ## Script 
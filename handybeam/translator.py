@@ -36,7 +36,7 @@ class Translator():
         self.translator = hb_translator_wrappers.Translator(parent = self.parent)
 
     
-    def xy_translate(self,x_translate,y_translate,plane_height,local_work_size = (1,1,1),print_performance_feedback= False):
+    def xy_translate(self,x_translate,y_translate,plane_height,local_work_size = None,print_performance_feedback= False):
 
         ''' Calls the OpenCL wrapper mixin class xy_translator which translates
         a given focal point, created at a height plane_height,by a distance x_translate
@@ -51,8 +51,8 @@ class Translator():
                 This is the desired distance to translate the focal point along the y-axis. 
         plane_height : numpy float
                 This is the z-coordinate of the focal point position.              
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), it is autotuned for the device.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
 
@@ -68,7 +68,7 @@ class Translator():
         self.parent.tx_array.tx_array_element_descriptor = kernel_output
 
     def xyz_translate(self,x_focus,y_focus,z_focus,x_translate,y_translate,z_translate,
-                    local_work_size = (1,1,1),print_performance_feedback = False):
+                    local_work_size = None,print_performance_feedback = False):
 
         ''' Calls the OpenCL wrapper mixin class xyz_translator which translates a given focal point, created at a height plane_height,
         by a distance x_translate along the x-axis and y_translate along the y-axis.
@@ -88,8 +88,8 @@ class Translator():
                 This is the desired distance to translate the focal point along the y-axis. 
         z_translate : numpy float
                 This is the desired distance to translate the focal point along the z-axis. 
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), it is autotuned for the device.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
 
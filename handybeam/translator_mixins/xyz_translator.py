@@ -5,6 +5,10 @@ import numpy as np
 import pyopencl as cl
 import handybeam.tx_array
 
+# Global variables
+
+tau = 2 * np.pi
+
 # Class
 
 class XYZTranslatorMixin():
@@ -40,11 +44,12 @@ class XYZTranslatorMixin():
 
         self._hbk_xyz_translator.set_scalar_arg_dtypes([None,None,
                                                         np.float32,np.float32,np.float32,
-                                                        np.float32,np.float32,np.float32 ])
+                                                        np.float32,np.float32,np.float32,
+                                                        np.float32 ])
 
     def xyz_translator(self, tx_array: handybeam.tx_array.TxArray,
                        x_focus, y_focus, z_focus, x_translate, y_translate,
-                       z_translate, local_work_size = (1,1,1), print_performance_feedback = False):
+                       z_translate, local_work_size = None, print_performance_feedback = False):
 
         '''
 
@@ -68,8 +73,9 @@ class XYZTranslatorMixin():
                 This is the desired distance to translate the focal point along the y-axis. 
         z_translate : numpy float
                 This is the desired distance to translate the focal point along the z-axis. 
-        local_work_size : tuple
-                Tuple containing the local work sizes for the GPU.
+        local_work_size : tuple or None
+                Tuple containing the local work sizes for the GPU. If None (default), the autotuned
+                work group shape for this device and problem size is used, see :code:`handybeam.cl_autotuner`.
         print_performance_feedback : boolean
                 Boolean value determining whether or not to output the GPU performance.
 
@@ -95,14 +101,16 @@ class XYZTranslatorMixin():
 
         cl_out_buffer = cl.Buffer(self.cl_system.context, cl.mem_flags.WRITE_ONLY, py_out_buffer.data.nbytes) 
 
-        # Create a buffer on the GPU to store the transducer data and copy the data from the CPU (tx_array.tx_array_element_descriptor)
-        # to the GPU.
+        # Get the device-resident copy of the transducer data (tx_array.tx_array_element_descriptor).
+        # Only the rows that changed since the last call are uploaded to the GPU.
+
+        cl_tx_element_array_descriptor = self.cl_system.tx_array_buffer(tx_array)
 
-        cl_tx_element_array_descriptor = cl.Buffer(self.cl_system.context, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR,hostbuf=tx_array.tx_array_element_descriptor)
+        # Enqueue the kernel with the initialised queue, work sizes and data.
 
-        # Create and execute an OpenCL event with the initialised queue, work sizes and data.
+        def launch(global_work_size, local_work_size):
 
-        cl_profiling_kernel_event = self._hbk_xyz_translator(  self.cl_system.queue,
+            return self._hbk_xyz_translator(  self.cl_system.queue,
                                                                 global_work_size,
                                                                 local_work_size,
                                                                 cl_tx_element_array_descriptor,
@@ -112,9 +120,21 @@ class XYZTranslatorMixin():
                                                                 np.float32(z_focus),
                                                                 np.float32(x_translate),
                                                                 np.float32(y_translate),
-                                                                np.float32(z_translate)
+                                                                np.float32(z_translate),
+                                                                np.float32(tau * self.parent.medium_wavenumber)
                                                                 )
 
+        # Unless given, use the fastest work group shape for this device - it is timed on the first call.
+
+        if local_work_size is None:
+            global_work_size, local_work_size = self.cl_system.autotuner.work_sizes(self._hbk_xyz_translator,
+                                                                                    global_work_size,
+                                                                                    launch)
+
+        # Create and execute an OpenCL event.
+
+        cl_profiling_kernel_event = launch(global_work_size, local_work_size)
+
         # Copy the results from the GPU buffer to the associated CPU buffer. 
 
         cl_profiling_mem_copy_event = cl.enqueue_copy(self.cl_system.queue,py_out_buffer, cl_out_buffer)
@@ -36,6 +36,12 @@ class TxArray(RememberInstanceCreationInfo):
     Attributes:
         tx_array_element_descriptor: (numpy.array) compact buffer describing the array. See :ref:`b_tx_array_compact_descriptor:tx_element_array_descriptor_a`
         name: (string). user-readable string/descriptor
+        generation: (int) incremented whenever a new descriptor is assigned, or :code:`mark_modified()` is called.
+        track_in_place_changes: (bool) if True (default), the OpenCL wrappers also detect changes made to the descriptor in place,
+            by comparing it with the copy that is on the device. Set to False to skip that comparison, if You always
+            assign a new descriptor or call :code:`mark_modified()` after a change.
+        device_buffers: (dict) device-resident copies of the descriptor, one per OpenCL context.
+            Managed by :meth:`handybeam.cl_system.OpenCLSystem.tx_array_buffer`.
 
 
     """
@@ -48,6 +54,15 @@ class TxArray(RememberInstanceCreationInfo):
 
     name = property(get_name, set_name)
 
+    def set_tx_array_element_descriptor(self, value):
+        self._tx_array_element_descriptor = value
+        self.generation = self.generation + 1
+
+    def get_tx_array_element_descriptor(self):
+        return self._tx_array_element_descriptor
+
+    tx_array_element_descriptor = property(get_tx_array_element_descriptor, set_tx_array_element_descriptor)
+
     def __init__(self, parent=None):
         """ Constructor
 
@@ -58,9 +73,20 @@ class TxArray(RememberInstanceCreationInfo):
 
         super().__init__()
         self.parent = parent
+        self.generation = 0
+        self.track_in_place_changes = True
+        self.device_buffers = {}
         self.tx_array_element_descriptor = self.generate_tx_array_element()
         self._name = "default single-element array"
 
+    def mark_modified(self):
+        """ Tells the OpenCL wrappers that the descriptor was changed in place.
+
+        Only needed if :code:`track_in_place_changes` is False. Assigning a new descriptor does this automatically.
+
+        """
+        self.generation = self.generation + 1
+
     def generate_empty_tx_element_descriptor(self):
         
         '''DESCRIPTION HERE
@@ -35,6 +35,9 @@ import numpy as np
 import handybeam.bugcatcher
 import handybeam.tx_array_library
 import handybeam.opencl_wrappers.propagator_wrappers
+import handybeam.opencl_wrappers.propagation_future
+import handybeam.cpu_wrappers.numpy_propagator
+import handybeam.cpu_wrappers.numba_propagator
 from handybeam.remember_instance_creation_info import RememberInstanceCreationInfo
 from os import linesep
 # # Global variables
@@ -44,6 +47,15 @@ __license__ = "Apache 2.0"
 tau = 2*np.pi
 """the tau constant. It really should get implemented into numpy."""
 
+propagator_backends = {
+    'opencl': lambda world: handybeam.opencl_wrappers.propagator_wrappers.Propagator(parent=world,
+                                                                                     use_device=world.device,
+                                                                                     use_platform=world.platform),
+    'numpy': lambda world: handybeam.cpu_wrappers.numpy_propagator.NumpyPropagator(parent=world),
+    'numba': lambda world: handybeam.cpu_wrappers.numba_propagator.NumbaPropagator(parent=world),
+}
+""" dict: the propagation engines that can be selected with :code:`World(backend=...)`, name -> factory taking the world."""
+
 # # Class
 
 
@@ -62,24 +74,26 @@ class World(RememberInstanceCreationInfo):
 
     .. note::
 
-        Note that OpenCL kernels are compiled with sound velocity and frequency as constants. This is for performance purposes.
+        The wavelength and wavenumber are passed to the OpenCL kernels at every call, so the frequency and the sound
+        velocity can be changed at any time - e.g. for a frequency sweep - without recompiling the kernels.
 
 
     Attributes:
-        sound_velocity (numpy.float): Sound velocity. Set only via creating a new world.
-        frequency (numpy.float): fundamental frequency of operation for the transmitter array. Set only via creating a new world.
-        medium_wavelength (numpy.float): computed wavelength for this world. constant.
-        medium_wavenumber (numpy.float): computed wavenumber for this world. constant.
+        sound_velocity (numpy.float): Sound velocity.
+        frequency (numpy.float): fundamental frequency of operation for the transmitter array.
+        medium_wavelength (numpy.float): wavelength for this world, computed from the sound velocity and the frequency.
+        medium_wavenumber (numpy.float): wavenumber for this world, computed from the sound velocity and the frequency.
         samplers (list[handybeam.samplers.*]): list of the field sampler objects.
         tx_array (handybeam.tx_array.TxArray): the transmitter array object.
         propagator (handybeam.opencl_wrappers.propagator_wrappers.Propagator): the object that holds the OpenCL code for calculating (propagating) the acoustic field.
+        backend (str): name of the propagation engine in use. See :code:`propagator_backends`.
         platform (int): OpenCL platform ID
         device (int): OpenCL device ID
 
 
     """
 
-    def __init__(self, frequency=40000, sound_velocity=343, use_device=0, use_platform=0):
+    def __init__(self, frequency=40000, sound_velocity=343, use_device=0, use_platform=0, backend='opencl'):
         """ instance constructor.
 
         Upon creation, add an example array, initialize the propagator, and have no samplers.
@@ -88,17 +102,33 @@ class World(RememberInstanceCreationInfo):
 
         At one point, I tried to make it to auto-give itself a default sampler,
         but that resulted in circular references. Possibly I can find a workaround to that later on.
+
+        :param backend: name of the propagation engine, one of :code:`propagator_backends`.
+            Use :code:`'numpy'` or :code:`'numba'` on machines without a usable OpenCL platform.
         """
         super().__init__()
         self.sound_velocity = sound_velocity
         self.frequency = frequency
-        self.medium_wavelength = np.float32(self.sound_velocity / self.frequency)
-        self.medium_wavenumber = 1 / self.medium_wavelength
         self.samplers = []
         self.device = use_device
         self.platform = use_platform
+        self.backend = backend
         self.tx_array = handybeam.tx_array_library.USX(parent=self)
-        self.propagator = handybeam.opencl_wrappers.propagator_wrappers.Propagator(parent=self,use_device = self.device, use_platform = self.platform)
+
+        if backend not in propagator_backends:
+            raise RuntimeError('Unknown propagator backend {}, use one of {}.'.format(backend, list(propagator_backends)))
+
+        self.propagator = propagator_backends[backend](self)
+
+    @property
+    def medium_wavelength(self):
+        """ wavelength in the medium, in meters. Follows changes to :code:`frequency` and :code:`sound_velocity`."""
+        return np.float32(self.sound_velocity / self.frequency)
+
+    @property
+    def medium_wavenumber(self):
+        """ wavenumber in the medium, in waves per meter, i.e. :code:`1/medium_wavelength`."""
+        return 1 / self.medium_wavelength
 
     def add_sampler(self, sampler=None):
         """ Adds a new field sampler to the world
@@ -142,6 +172,28 @@ class World(RememberInstanceCreationInfo):
         for sampler in self.samplers:
             sampler.propagate(print_performance_feedback=print_performance_feedback) 
 
+    def propagate_async(self, print_performance_feedback=False):
+        """ Shortcut: Ask all the field samplers to start their propagators, without waiting for them
+
+        calls :code:`sampler.propagate_async(...)` of each sampler in the samplers list
+
+        .. code-block:: python
+
+            future = world.propagate_async()
+            # ... prepare the next frame here ...
+            future.result()
+
+        :param print_performance_feedback: if set to True, will print feedback to console
+        :return: a :class:`handybeam.opencl_wrappers.propagation_future.PropagationFuture`.
+            Its :code:`result()` waits for all the samplers to be updated, and returns the list of the samplers.
+        """
+
+        futures = [sampler.propagate_async(print_performance_feedback=print_performance_feedback)
+                   for sampler in self.samplers]
+
+        return handybeam.opencl_wrappers.propagation_future.PropagationFuture(result=list(self.samplers),
+                                                                             dependencies=futures)
+
     def visualise(self, colour_scale=None):
         """ Shortcut: Ask all the field samplers to execute it's visualizer
 
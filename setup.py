@@ -30,6 +30,7 @@ setup(
         packages=['handybeam',
                     'handybeam.cl',
                     'handybeam.cl_py_ref_code',
+                    'handybeam.cpu_wrappers',
                     'handybeam.opencl_wrappers',
                     'handybeam.propagator_mixins',
                     'handybeam.samplers',